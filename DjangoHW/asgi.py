@@ -5,6 +5,16 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Async-эндпоинты /async/... (task_hw8/async_views.py) не блокируют поток только здесь;
+под WSGI Django выполняет их в отдельном event loop на каждый запрос.
+
+Сравнение профилей при одинаковом числе воркеров:
+
+    gunicorn DjangoHW.wsgi -w 4 -b 127.0.0.1:8000
+    uvicorn DjangoHW.asgi:application --workers 4 --port 8001
+    python manage.py loadtest --wsgi-url http://127.0.0.1:8000 --asgi-url http://127.0.0.1:8001 \
+        --wsgi-pid <pid gunicorn> --asgi-pid <pid uvicorn> --username ... --password ...
 """
 
 import os
@@ -20,18 +20,25 @@ from greetings.views import greetings
 from task_hw8.views import (
     create_task,
     get_all_tasks,
+    export_tasks,
     get_task_by_id,
     task_statistics,
+    cache_statistics,
     SubTaskListView,
     SubTaskListCreateView,
     SubTaskRetrieveUpdateDestroyView,
     TaskListCreateView,
+    TaskBulkView,
+    TaskImportView,
+    SubTaskBulkView,
     TaskRetrieveUpdateDestroyView,
     get_tasks_by_weekday,
     CategoryViewSet,
     test_log,
 )
 
+from task_hw8 import async_views
+from task_hw8.metrics import metrics
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -64,14 +71,27 @@ urlpatterns = [
 
     path('tasks/create/', create_task, name='task-create'),
     path('tasks/', TaskListCreateView.as_view(), name='task-list-create'),
+    path('tasks/all/', get_all_tasks, name='task-list-all'),
+    path('tasks/bulk/', TaskBulkView.as_view(), name='task-bulk'),
+    path('tasks/import/', TaskImportView.as_view(), name='task-import'),
+    path('tasks/export/', export_tasks, name='task-export'),
     path('tasks/<int:pk>/', TaskRetrieveUpdateDestroyView.as_view(), name='task-detail-update-delete'),
     path('tasks/stats/', task_statistics, name='task-stats'),
     path('tasks/by-weekday/', get_tasks_by_weekday, name='task-by-weekday'),
+    path('cache/stats/', cache_statistics, name='cache-stats'),
+    path('metrics', metrics, name='metrics'),
 
     path('subtasks/', SubTaskListCreateView.as_view(), name='subtask-list-create'),
     path('subtasks/list/', SubTaskListView.as_view(), name='subtask-list'),
+    path('subtasks/bulk/', SubTaskBulkView.as_view(), name='subtask-bulk'),
     path('subtasks/<int:pk>/', SubTaskRetrieveUpdateDestroyView.as_view(), name='subtask-detail-update-delete'),
 
+    # Async-версии для запуска под ASGI (DjangoHW/asgi.py)
+    path('async/tasks/', async_views.task_list, name='async-task-list'),
+    path('async/tasks/<int:pk>/', async_views.task_detail, name='async-task-detail'),
+    path('async/tasks/stats/', async_views.task_statistics, name='async-task-stats'),
+    path('async/subtasks/', async_views.subtask_list, name='async-subtask-list'),
+
     path('api/', include(router.urls)),
     path('test-log/', test_log, name='test_log'),
 
@@ -1,9 +1,12 @@
 from re import search
 
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
 from django.contrib import messages
-from task_hw8.models import Task, SubTask, Category
+from task_hw8.models import Task, SubTask, Category, Status
+from task_hw8.cache import bump_user_versions
+from task_hw8.stats import recompute_task_stats
 
 
 class SubTaskInline(admin.TabularInline):
@@ -13,8 +16,12 @@ class SubTaskInline(admin.TabularInline):
 
 @admin.action(description="Архивировать задачи со статусом 'Done'")
 def mark_as_archived(modeladmin, request, queryset):
-    done_tasks = queryset.filter(status="Done")
-    count = done_tasks.update(status="Archived")
+    done_tasks = queryset.filter(status=Status.DONE)
+    owner_ids = set(done_tasks.values_list('owner_id', flat=True))
+    count = done_tasks.update(status=Status.ARCHIVED, updated_at=timezone.now())
+    # update() обходит сигналы, поэтому статистику и кеш владельцев обновляем явно
+    recompute_task_stats([owner_id for owner_id in owner_ids if owner_id])
+    bump_user_versions(owner_ids)
     modeladmin.message_user(request, f"Архивировано задач: {count}", messages.SUCCESS)
 
 
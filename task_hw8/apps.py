@@ -6,7 +6,13 @@ class TaskHw8Config(AppConfig):
     name = 'task_hw8'
 
     def ready(self):
+        from django.db.backends.signals import connection_created
+
+        import task_hw8.checks
         import task_hw8.signals
+        from task_hw8.metrics import install_sql_timing
+
+        connection_created.connect(install_sql_timing)
 
 
 
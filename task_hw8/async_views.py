@@ -0,0 +1,114 @@
+"""Async-версии самых частых GET-эндпоинтов.
+
+Работают только под ASGI (DjangoHW/asgi.py): запрос не занимает поток, пока ждёт БД.
+Ответы совпадают с DRF-версиями из views.py, но без browsable API, поиска и кеша.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from task_hw8.authentication import aauthenticate
+from task_hw8.models import SubTask, Status, Task, parse_status
+from task_hw8.optimizers import optimize_queryset
+from task_hw8.pagination import SubTaskPagination
+from task_hw8.serializers import SubTaskCreateSerializer, TaskCreateSerializer, TaskDetailSerializer
+from task_hw8.stats import get_task_stats, status_counts
+from task_hw8.streaming import dumps
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+def async_login_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await aauthenticate(request)
+        if request.user is None:
+            return json_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def page_link(request, page, last_page):
+    url = request.build_absolute_uri()
+    if page < 1 or page > last_page:
+        return None
+    if page == 1:
+        return remove_query_param(url, 'page')
+    return replace_query_param(url, 'page', page)
+
+
+async def paginate(request, queryset, serializer_class, page_size):
+    """Ответ в формате PageNumberPagination: COUNT и страница через async ORM."""
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 0
+    count = await queryset.acount()
+    last_page = max(1, -(-count // page_size))
+    if page < 1 or page > last_page:
+        return json_response({'detail': 'Invalid page.'}, status=404)
+
+    offset = (page - 1) * page_size
+    objs = [obj async for obj in queryset[offset:offset + page_size]]
+    return json_response({
+        'count': count,
+        'next': page_link(request, page + 1, last_page),
+        'previous': page_link(request, page - 1, last_page),
+        'results': serializer_class(objs, many=True, context={'request': request}).data,
+    })
+
+
+def filter_status(request, queryset):
+    status_param = request.GET.get('status')
+    if not status_param:
+        return queryset
+    status = parse_status(status_param)
+    return queryset.none() if status is None else queryset.filter(status=status)
+
+
+@require_GET
+@async_login_required
+async def task_list(request):
+    tasks = optimize_queryset(Task.objects.filter(owner=request.user), TaskCreateSerializer())
+    tasks = filter_status(request, tasks).order_by('-created_at', '-id')
+    return await paginate(request, tasks, TaskCreateSerializer, api_settings.PAGE_SIZE)
+
+
+@require_GET
+@async_login_required
+async def task_detail(request, pk):
+    tasks = optimize_queryset(Task.objects.filter(owner=request.user), TaskDetailSerializer())
+    try:
+        task = await tasks.aget(pk=pk)
+    except Task.DoesNotExist:
+        return json_response({'detail': 'No Task matches the given query.'}, status=404)
+    return json_response(TaskDetailSerializer(task).data)
+
+
+@require_GET
+@async_login_required
+async def subtask_list(request):
+    subtasks = optimize_queryset(SubTask.objects.filter(owner=request.user), SubTaskCreateSerializer())
+    subtasks = filter_status(request, subtasks).order_by('-created_at', '-id')
+    return await paginate(request, subtasks, SubTaskCreateSerializer, SubTaskPagination.page_size)
+
+
+@require_GET
+@async_login_required
+async def task_statistics(request):
+    # get_task_stats при отсутствии строки сам её создаёт — это пока только sync-код
+    stats = await sync_to_async(get_task_stats)(request.user.id)
+    overdue_tasks = await Task.objects.filter(owner=request.user, deadline__lt=timezone.now())\
+                              .exclude(status=Status.DONE).acount()
+    return json_response({
+        'total_tasks': stats.total,
+        'status_counts': status_counts(stats),
+        'overdue_tasks': overdue_tasks,
+    })
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from task_hw8.metrics import timed
+
+
+class VerifiedTokenCache:
+    """Ограниченный LRU уже проверенных JWT: подпись и JSON разбираются один раз на процесс.
+
+    Ключ — (класс токена, строка токена). Записи с истёкшим exp не отдаются и
+    вытесняются первыми, когда кеш заполнен.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token, token_class=AccessToken):
+        if isinstance(raw_token, bytes):
+            raw_token = raw_token.decode()
+        key = (token_class, raw_token)
+        now = time.time()
+
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is not None:
+                if token['exp'] > now:
+                    self._tokens.move_to_end(key)
+                    return token
+                del self._tokens[key]
+                raise TokenError(_('Token is expired'))
+
+        # Проверка подписи — вне блокировки, TokenError уходит вызывающему
+        token = token_class(raw_token)
+        self.add(raw_token, token)
+        return token
+
+    def add(self, raw_token, token):
+        """Кладёт токен, который уже проверен или только что выпущен этим процессом."""
+        key = (type(token), raw_token)
+        with self._lock:
+            if key not in self._tokens and len(self._tokens) >= self.maxsize:
+                self._evict(time.time())
+            self._tokens[key] = token
+            self._tokens.move_to_end(key)
+
+    def _evict(self, now):
+        expired = [key for key, token in self._tokens.items() if token['exp'] <= now]
+        for key in expired:
+            del self._tokens[key]
+        while len(self._tokens) >= self.maxsize:
+            self._tokens.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+token_cache = VerifiedTokenCache(getattr(settings, 'JWT_TOKEN_CACHE_SIZE', 1024))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, который берёт проверенный токен из token_cache."""
+
+    def authenticate(self, request):
+        with timed('auth'):
+            result = super().authenticate(request)
+        if result is not None:
+            # Claims доступны и представлениям, и Django-запросу под DRF
+            request._request.jwt_claims = result[1].payload
+        return result
+
+    def get_validated_token(self, raw_token):
+        messages = []
+        for AuthToken in api_settings.AUTH_TOKEN_CLASSES:
+            try:
+                return token_cache.get(raw_token, AuthToken)
+            except TokenError as e:
+                messages.append(
+                    {
+                        "token_class": AuthToken.__name__,
+                        "token_type": AuthToken.token_type,
+                        "message": e.args[0],
+                    }
+                )
+
+        raise InvalidToken(
+            {
+                "detail": _("Given token not valid for any token type"),
+                "messages": messages,
+            }
+        )
+
+
+async def aauthenticate(request):
+    """Пользователь async-представления: Bearer/cookie access_token или сессия.
+
+    Проверка подписи идёт через тот же token_cache, к БД — только aget() пользователя.
+    """
+    header = request.headers.get('Authorization', '').split()
+    if len(header) == 2 and header[0] in api_settings.AUTH_HEADER_TYPES:
+        raw_token = header[1]
+    else:
+        raw_token = request.COOKIES.get('access_token')
+
+    if raw_token:
+        for AuthToken in api_settings.AUTH_TOKEN_CLASSES:
+            try:
+                token = token_cache.get(raw_token, AuthToken)
+            except TokenError:
+                continue
+            user_model = get_user_model()
+            try:
+                user = await user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: token[api_settings.USER_ID_CLAIM]}
+                )
+            except (KeyError, user_model.DoesNotExist):
+                return None
+            return user if user.is_active else None
+        return None
+
+    user = await request.auser()
+    return user if user.is_authenticated else None
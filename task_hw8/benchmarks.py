@@ -0,0 +1,10 @@
+"""Общие данные для команд замеров и генерации тестовых данных."""
+
+WORDS = ('отчёт', 'бюджет', 'релиз', 'встреча', 'ревью', 'миграция', 'клиент', 'сервер',
+         'report', 'budget', 'release', 'deploy', 'backup', 'invoice', 'design', 'review')
+
+
+def vocabulary(rng, size):
+    """WORDS плюс size случайных слов, чтобы совпадения были редкими, как в живых данных."""
+    letters = 'абвгдеклмнопрстуaeioubcdfgklmnprst'
+    return list(WORDS) + [''.join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(size)]
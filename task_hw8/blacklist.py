@@ -0,0 +1,128 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BloomFilter:
+    """Bloom filter по строкам: «точно нет» или «возможно есть» с заданной долей ложных срабатываний."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistCache:
+    """Проверка JTI по чёрному списку без запроса к БД в обычном случае.
+
+    Bloom filter загружается из BlacklistedToken при первой проверке в процессе и
+    догружает новые строки (id > последнего известного) не чаще раза в max_staleness
+    секунд — это и есть предел, на который другой процесс может «не знать» об
+    отзыве токена. Токены, отозванные в этом процессе, видны сразу. Срабатывание
+    фильтра подтверждается запросом, подтверждённые JTI держатся в маленьком LRU.
+    """
+
+    def __init__(self, max_staleness=30, lru_size=1024, capacity=100000):
+        self.max_staleness = max_staleness
+        self.lru_size = lru_size
+        self.capacity = capacity
+        self._bloom = None
+        self._confirmed = OrderedDict()
+        self._last_id = 0
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+
+    def _load(self, since_id=0):
+        rows = BlacklistedToken.objects.filter(id__gt=since_id).values_list('id', 'token__jti')
+        for row_id, jti in rows.iterator(chunk_size=5000):
+            self._bloom.add(jti)
+            self._last_id = max(self._last_id, row_id)
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._bloom is None or self._bloom.count > self._bloom.capacity:
+            # Первая загрузка или фильтр переполнен — строим заново с запасом
+            self.capacity = max(self.capacity, BlacklistedToken.objects.count() * 2)
+            self._bloom = BloomFilter(self.capacity)
+            self._last_id = 0
+            self._load()
+            self._loaded_at = now
+        elif now - self._loaded_at >= self.max_staleness:
+            self._load(self._last_id)
+            self._loaded_at = now
+
+    def _remember(self, jti):
+        self._confirmed[jti] = True
+        self._confirmed.move_to_end(jti)
+        while len(self._confirmed) > self.lru_size:
+            self._confirmed.popitem(last=False)
+
+    def is_blacklisted(self, jti):
+        with self._lock:
+            self._refresh()
+            if jti not in self._bloom:
+                return False
+            if jti in self._confirmed:
+                self._confirmed.move_to_end(jti)
+                return True
+
+        blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if blacklisted:
+            with self._lock:
+                self._remember(jti)
+        return blacklisted
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+            self._remember(jti)
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._confirmed.clear()
+
+
+blacklist_cache = BlacklistCache(
+    max_staleness=getattr(settings, 'JWT_BLACKLIST_MAX_STALENESS', 30),
+    lru_size=getattr(settings, 'JWT_BLACKLIST_LRU_SIZE', 1024),
+)
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """RefreshToken, который проверяет чёрный список через blacklist_cache."""
+
+    def check_blacklist(self):
+        if blacklist_cache.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_cache.add(self.payload[api_settings.JTI_CLAIM])
+        return result
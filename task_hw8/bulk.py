@@ -0,0 +1,236 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import bump_user_versions
+from .optimizers import optimize_queryset
+
+
+def is_pk(value):
+    # bool — подкласс int: true иначе означал бы объект с id 1
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def split_m2m(model, data):
+    """Отделяет значения many-to-many полей от обычных колонок."""
+    m2m_names = {field.name for field in model._meta.many_to_many}
+    m2m = {name: data.pop(name) for name in list(data) if name in m2m_names}
+    return data, m2m
+
+
+def prepare_instance(obj):
+    # bulk_create/bulk_update не вызывают save(), поэтому производные колонки считаем сами
+    sync = getattr(obj, 'sync_derived_fields', None)
+    if sync:
+        sync()
+
+
+def bulk_insert(model, objs, key, batch_size=None):
+    """bulk_create с заполненными pk и там, где БД не возвращает их из INSERT (MySQL).
+
+    key — уникальное поле, по которому строки находятся повторно.
+    """
+    model.objects.bulk_create(objs, batch_size=batch_size)
+    if objs and objs[0].pk is None:
+        pks = dict(model.objects.filter(**{f'{key}__in': [getattr(obj, key) for obj in objs]})
+                   .values_list(key, 'pk'))
+        for obj in objs:
+            obj.pk = pks[getattr(obj, key)]
+    return objs
+
+
+def touch_auto_now(objs):
+    """bulk_update() не вызывает pre_save(), поэтому auto_now-поля проставляем сами."""
+    fields = [field for field in objs[0]._meta.concrete_fields if getattr(field, 'auto_now', False)]
+    for obj in objs:
+        for field in fields:
+            field.pre_save(obj, add=False)
+    return {field.name for field in fields}
+
+
+def write_m2m(model, objs, m2m_values, replace=False):
+    """Пишет строки through-таблиц одним bulk_create на каждое M2M поле.
+
+    Возвращает {имя поля: id связанных объектов}, у которых появились или пропали связи.
+    """
+    touched_ids = {}
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+
+        touched = [obj for obj, values in zip(objs, m2m_values) if field.name in values]
+        if not touched:
+            continue
+        ids = touched_ids.setdefault(field.name, set())
+        if replace:
+            old_links = through.objects.filter(**{f'{source}__in': [obj.pk for obj in touched]})
+            ids.update(old_links.values_list(f'{target}_id', flat=True))
+            old_links.delete()
+        rows = [
+            through(**{f'{source}_id': obj.pk, f'{target}_id': related.pk})
+            for obj, values in zip(objs, m2m_values) if field.name in values
+            for related in values[field.name]
+        ]
+        ids.update(getattr(row, f'{target}_id') for row in rows)
+        through.objects.bulk_create(rows)
+    return touched_ids
+
+
+class BulkWriteAPIView(APIView):
+    """Пакетное создание (POST), изменение (PATCH) и удаление (DELETE) объектов пользователя.
+
+    Пакет целиком валидируется сериализатором в режиме many=True и пишется одной
+    транзакцией через bulk_create/bulk_update. Ответ — список результатов в
+    порядке входных элементов. Сигналы pre_save/post_save при этом не
+    отправляются, всё, что от них зависит, делается в after_write().
+    """
+    permission_classes = [IsAuthenticated]
+    model = None
+    serializer_class = None
+    unique_field = 'title'
+
+    def get_queryset(self):
+        return self.model.objects.filter(owner=self.request.user)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('context', {'request': self.request, 'view': self})
+        return self.serializer_class(*args, **kwargs)
+
+    def after_write(self, objs):
+        """Хук для кеша, статистики и уведомлений.
+
+        После PATCH исходные значения доступны через obj.get_original():
+        bulk_update() не обновляет снимок FieldTrackingMixin. В self.m2m_touched —
+        id объектов на другой стороне M2M, чьи связи поменялись.
+        """
+
+    def check_list(self, items):
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Ожидается непустой список объектов'}, status=status.HTTP_400_BAD_REQUEST)
+        return None
+
+    def duplicate_errors(self, values):
+        counts = Counter(value for value in values if value is not None)
+        if all(count == 1 for count in counts.values()):
+            return None
+        return [
+            {self.unique_field: ['Значение повторяется в пакете.']} if counts.get(value, 0) > 1 else {}
+            for value in values
+        ]
+
+    def results(self, objs):
+        """Перечитывает объекты одним оптимизированным запросом, сохраняя порядок пакета."""
+        serializer = self.get_serializer()
+        queryset = optimize_queryset(self.model.objects.filter(pk__in=[obj.pk for obj in objs]), serializer)
+        by_pk = {obj.pk: obj for obj in queryset}
+        return self.get_serializer([by_pk[obj.pk] for obj in objs], many=True).data
+
+    def post(self, request):
+        # Заводится на запрос: атрибут класса был бы общим для всех запросов
+        self.m2m_touched = {}
+        error = self.check_list(request.data)
+        if error:
+            return error
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        errors = self.duplicate_errors([item.get(self.unique_field) for item in serializer.validated_data])
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        objs, m2m_values = [], []
+        for data in serializer.validated_data:
+            data, m2m = split_m2m(self.model, dict(data))
+            obj = self.model(owner=request.user, **data)
+            prepare_instance(obj)
+            objs.append(obj)
+            m2m_values.append(m2m)
+
+        try:
+            with transaction.atomic():
+                bulk_insert(self.model, objs, self.unique_field)
+                self.m2m_touched = write_m2m(self.model, objs, m2m_values)
+        except IntegrityError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        bump_user_versions([request.user.id])
+        self.after_write(objs)
+        return Response(self.results(objs), status=status.HTTP_201_CREATED)
+
+    def patch(self, request):
+        self.m2m_touched = {}
+        error = self.check_list(request.data)
+        if error:
+            return error
+
+        instances = self.get_queryset().in_bulk(
+            [item['id'] for item in request.data if isinstance(item, dict) and is_pk(item.get('id'))]
+        )
+
+        serializers, errors = [], []
+        for item in request.data:
+            if not isinstance(item, dict):
+                errors.append({'non_field_errors': ['Ожидается объект.']})
+                continue
+            if not is_pk(item.get('id')):
+                errors.append({'id': ['Ожидается целое число.']})
+                continue
+            instance = instances.get(item['id'])
+            if instance is None:
+                errors.append({'id': ['Объект не найден.']})
+                continue
+            serializer = self.get_serializer(instance, data=item, partial=True)
+            errors.append({} if serializer.is_valid() else serializer.errors)
+            serializers.append(serializer)
+        if any(errors):
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        objs, m2m_values, fields = [], [], set()
+        for serializer in serializers:
+            data, m2m = split_m2m(self.model, dict(serializer.validated_data))
+            obj = serializer.instance
+            for attr, value in data.items():
+                setattr(obj, attr, value)
+            prepare_instance(obj)
+            fields.update(data)
+            objs.append(obj)
+            m2m_values.append(m2m)
+
+        if len({obj.pk for obj in objs}) != len(objs):
+            return Response({'error': 'Один объект указан в пакете несколько раз'}, status=status.HTTP_400_BAD_REQUEST)
+        if fields:
+            fields.update(getattr(self.model, 'derived_fields', ()))
+        # Даже если поменялись только M2M, объект считается изменённым
+        fields.update(touch_auto_now(objs))
+
+        try:
+            with transaction.atomic():
+                if fields:
+                    self.model.objects.bulk_update(objs, sorted(fields))
+                self.m2m_touched = write_m2m(self.model, objs, m2m_values, replace=True)
+        except IntegrityError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        bump_user_versions([request.user.id])
+        self.after_write(objs)
+        return Response(self.results(objs))
+
+    def delete(self, request):
+        error = self.check_list(request.data)
+        if error:
+            return error
+        if not all(is_pk(pk) for pk in request.data):
+            return Response({'error': 'Ожидается список id'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset().filter(pk__in=request.data)
+        found = set(queryset.values_list('pk', flat=True))
+        with transaction.atomic():
+            queryset.delete()
+        bump_user_versions([request.user.id])
+        return Response([{'id': pk, 'deleted': pk in found} for pk in request.data])
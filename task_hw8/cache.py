@@ -0,0 +1,167 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from task_hw8.metrics import timed
+
+
+CACHE_ALIAS = getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+# Данные пользователя (задачи, подзадачи, статистика) и общий список категорий
+USER_SCOPE = 'user'
+CATEGORIES_SCOPE = 'categories'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+class CacheCounters:
+    """Попадания и промахи кеша ответов в этом процессе."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, name, value=1):
+        with self._lock:
+            self._counts[name] += value
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        requests = counts.get('hits', 0) + counts.get('misses', 0)
+        counts['hit_ratio'] = round(counts.get('hits', 0) / requests, 3) if requests else 0.0
+        return counts
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+counters = CacheCounters()
+
+
+def version_key(scope, user_id=None):
+    return f'resp:version:{scope}' if user_id is None else f'resp:version:{scope}:{user_id}'
+
+
+def modified_key(scope, user_id):
+    return f'resp:modified:{scope}:{user_id}'
+
+
+def new_version():
+    # Не 1: после вытеснения ключа версии старые записи не должны снова стать актуальными
+    return time.time_ns()
+
+
+def bump_version(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_version(), None)
+
+
+def bump_user_versions(user_ids):
+    """Инвалидирует все закешированные ответы пользователей без перебора ключей.
+
+    Заодно запоминает секунду записи — для Last-Modified (conditional.py).
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    for user_id in user_ids:
+        bump_version(version_key(USER_SCOPE, user_id))
+    if user_ids:
+        now = int(time.time())
+        get_cache().set_many({modified_key(USER_SCOPE, user_id): now for user_id in user_ids}, None)
+
+
+def bump_categories_version():
+    bump_version(version_key(CATEGORIES_SCOPE))
+
+
+def current_version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def response_key(request, scope):
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.md5(f'{request.path}?{params}'.encode(), usedforsecurity=False).hexdigest()
+    if scope == CATEGORIES_SCOPE:
+        return f'resp:{scope}:{current_version(version_key(scope))}:{digest}'
+    user_id = request.user.pk
+    return f'resp:{scope}:{user_id}:{current_version(version_key(scope, user_id))}:{digest}'
+
+
+def cached_response(request, compute, timeout=None, scope=USER_SCOPE):
+    """Отдаёт готовый JSON из кеша или вызывает compute() и кладёт результат в кеш.
+
+    Кешируются только успешные GET с JSON-рендерером. Ключ включает версию данных
+    пользователя (или категорий), поэтому запись становится недоступна сразу
+    после любого изменения.
+    """
+    if (request.method != 'GET' or not request.user.is_authenticated
+            or getattr(request.accepted_renderer, 'format', None) != 'json'):
+        return compute()
+
+    cache = get_cache()
+    key = response_key(request, scope)
+    cached = cache.get(key)
+    if cached is not None:
+        counters.add('hits')
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    counters.add('misses')
+    response = compute()
+    if isinstance(response, Response) and response.status_code == 200:
+        # Рендерим сразу, чтобы положить в кеш уже готовые байты
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = {'request': request, 'response': response}
+        with timed('render'):
+            response.render()
+        content_type = response.get('Content-Type', response.accepted_media_type)
+        cache.set(key, (response.content, content_type), CACHE_TIMEOUT if timeout is None else timeout)
+        response['X-Cache'] = 'MISS'
+    return response
+
+
+class CachedResponseMixin:
+    """Кеш ответов list() и retrieve() для generic views и viewsets."""
+    cache_timeout = None
+    cache_scope = USER_SCOPE
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(request, lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs),
+                               self.cache_timeout, self.cache_scope)
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(request, lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs),
+                               self.cache_timeout, self.cache_scope)
+
+
+def cache_response(timeout=None, scope=USER_SCOPE):
+    """То же для функций-представлений: ставится под @api_view."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            return cached_response(request, lambda: func(request, *args, **kwargs), timeout, scope)
+        return wrapper
+    return decorator
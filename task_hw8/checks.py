@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from task_hw8.cache import CACHE_ALIAS
+
+
+# Бэкенды, у которых каждый процесс видит только свой кеш
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_response_cache(app_configs, **kwargs):
+    """manage.py check --deploy: версии кеша ответов, ETag и закрепление за default
+    работают только на общем для всех воркеров кеше."""
+    backend = settings.CACHES.get(CACHE_ALIAS, {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        f'Кеш "{CACHE_ALIAS}" ({backend}) не общий для процессов: запись в одном воркере '
+        'не инвалидирует кеш ответов и ETag в остальных.',
+        hint='Задайте CACHE_URL=redis://... (или другой общий бэкенд), если воркеров больше одного.',
+        id='task_hw8.W001',
+    )]
@@ -0,0 +1,65 @@
+import hashlib
+import time
+
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from task_hw8.cache import USER_SCOPE, current_version, get_cache, modified_key, version_key
+
+
+def resource_etag(request):
+    """ETag по версии данных пользователя — та же версия, что и в ключах кеша ответов.
+
+    Любая запись задач, подзадач и связей владельца сдвигает версию (signals.py,
+    BulkWriteAPIView), поэтому ETag меняется и при удалении, и при нескольких
+    записях за секунду. Запроса к БД нет: 304 отдаётся раньше кеша ответов.
+    """
+    version = current_version(version_key(USER_SCOPE, request.user.pk))
+    renderer = getattr(request, 'accepted_renderer', None)
+    source = '|'.join([str(request.user.pk), str(version), request.get_full_path(), getattr(renderer, 'format', '')])
+    return quote_etag(hashlib.md5(source.encode(), usedforsecurity=False).hexdigest())
+
+
+def resource_last_modified(request):
+    """Секунда последней записи данных пользователя или None.
+
+    Значение в текущей секунде не отдаём: запись в ту же секунду уже после ответа
+    не сдвинула бы Last-Modified, и If-Modified-Since дал бы ложный 304.
+    """
+    modified = get_cache().get(modified_key(USER_SCOPE, request.user.pk))
+    if modified is None or modified >= int(time.time()):
+        return None
+    return modified
+
+
+def conditional_response(request, compute):
+    """304 без сериализации, если клиент прислал актуальный If-None-Match или If-Modified-Since."""
+    if request.method not in ('GET', 'HEAD') or not request.user.is_authenticated:
+        return compute()
+
+    etag = resource_etag(request)
+    last_modified = resource_last_modified(request)
+    not_modified = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    response = compute()
+    if response.status_code == 200:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для list() и retrieve() generic views.
+
+    Ставится перед CachedResponseMixin, чтобы 304 не трогал даже кеш.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(request, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(request,
+                                    lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,93 @@
+"""Потоковая выгрузка задач с подзадачами и именами категорий в CSV или NDJSON.
+
+Колонки совпадают с форматом импорта (task_hw8/importer.py), поэтому выгрузку
+можно загрузить обратно. Задачи читаются queryset.iterator(chunk_size) —
+на PostgreSQL это серверный курсор, — а подзадачи и категории подтягиваются
+prefetch_related на каждый чанк: три запроса на чанк независимо от размера выгрузки.
+"""
+import csv
+import io
+
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+
+from .models import Category, Status, SubTask
+from .streaming import STREAM_CHUNK_SIZE, dumps, iter_chunks
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+EXPORT_COLUMNS = ['id', 'title', 'description', 'status', 'deadline', 'created_at', 'updated_at',
+                  'categories', 'subtasks']
+
+TASK_FIELDS = ('id', 'title', 'description', 'status', 'deadline', 'created_at', 'updated_at')
+SUBTASK_FIELDS = ('id', 'task_id', 'title', 'description', 'status', 'deadline', 'created_at')
+
+
+def export_queryset(queryset):
+    """Только нужные колонки и prefetch связей; порядок по pk — для стабильной выгрузки."""
+    return queryset.only(*TASK_FIELDS).order_by('pk').prefetch_related(
+        Prefetch('subtask_set', queryset=SubTask.objects.only(*SUBTASK_FIELDS).order_by('pk')),
+        Prefetch('categories', queryset=Category.objects.only('id', 'name').order_by('name')),
+    )
+
+
+def isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def export_row(task):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'status': Status(task.status).label,
+        'deadline': isoformat(task.deadline),
+        'created_at': isoformat(task.created_at),
+        'updated_at': isoformat(task.updated_at),
+        'categories': [category.name for category in task.categories.all()],
+        'subtasks': [
+            {
+                'id': subtask.id,
+                'title': subtask.title,
+                'description': subtask.description,
+                'status': Status(subtask.status).label,
+                'deadline': isoformat(subtask.deadline),
+                'created_at': isoformat(subtask.created_at),
+            }
+            for subtask in task.subtask_set.all()
+        ],
+    }
+
+
+def stream_csv(queryset, chunk_size=STREAM_CHUNK_SIZE):
+    # Категории — через «;», подзадачи — JSON-массивом в одной колонке
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in iter_chunks(export_queryset(queryset), chunk_size):
+        for task in chunk:
+            row = export_row(task)
+            row['categories'] = ';'.join(row['categories'])
+            row['subtasks'] = dumps(row['subtasks'])
+            writer.writerow([row[column] for column in EXPORT_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Заголовок без строк, если задач нет
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(queryset, chunk_size=STREAM_CHUNK_SIZE):
+    for chunk in iter_chunks(export_queryset(queryset), chunk_size):
+        yield ''.join(dumps(export_row(task)) + '\n' for task in chunk)
+
+
+def export_response(queryset, fmt, filename='tasks', chunk_size=STREAM_CHUNK_SIZE):
+    body = stream_csv(queryset, chunk_size) if fmt == 'csv' else stream_ndjson(queryset, chunk_size)
+    response = StreamingHttpResponse(body, content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
@@ -0,0 +1,150 @@
+"""Быстрый путь чтения для списков: values() вместо объектов модели и полей DRF.
+
+ValuesSerializer строится по обычному ModelSerializer: запрашивает из БД ровно
+колонки его читаемых полей и переводит каждое значение функцией, выбранной
+заранее по типу поля. Результат совпадает с serializer.data до байта в JSON.
+Сериализаторы с полями без такой функции (вложенные сериализаторы,
+SerializerMethodField, source через точку) остаются на обычном пути.
+"""
+from django.db.models import ManyToManyField
+from rest_framework import serializers
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .metrics import timed
+from .models import Status
+from .serializers import StatusLabelField
+
+
+# Поля, у которых to_representation для значения из БД ничего не меняет
+IDENTITY_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+
+class UnsupportedField(Exception):
+    pass
+
+
+def field_converter(field):
+    """Функция значение из values() -> как в serializer.data; None — значение как есть."""
+    if isinstance(field, StatusLabelField):
+        return dict(Status.choices).__getitem__
+    if type(field) in IDENTITY_FIELDS:
+        return None
+    if type(field) is serializers.BigIntegerField:
+        # id моделей с BigAutoField; строкой — только при COERCE_BIGINT_TO_STRING
+        return str if getattr(field, 'coerce_to_string', api_settings.COERCE_BIGINT_TO_STRING) else None
+    if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+        # values() по FK отдаёт тот же pk, что и PKOnlyObject
+        return None
+    if type(field) in (serializers.DateTimeField, serializers.DateField, serializers.DecimalField,
+                       serializers.FloatField, serializers.UUIDField):
+        # Зависят от настроек и текущей таймзоны — берём метод самого поля
+        return field.to_representation
+    raise UnsupportedField(field.field_name)
+
+
+class ValuesSerializer:
+    def __init__(self, serializer):
+        model = serializer.Meta.model
+        self.columns = [model._meta.pk.name]
+        self.fields = []
+        self.many_to_many = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or '.' in field.source:
+                raise UnsupportedField(name)
+            if isinstance(field, serializers.ManyRelatedField):
+                self.many_to_many.append((name, self.many_to_many_lookup(model, field)))
+                continue
+            self.fields.append((name, field.source, field_converter(field)))
+            self.columns.append(field.source)
+        self.columns = list(dict.fromkeys(self.columns))
+        self.pk_name = model._meta.pk.name
+
+    @staticmethod
+    def many_to_many_lookup(model, field):
+        if not isinstance(field.child_relation, serializers.PrimaryKeyRelatedField) or field.child_relation.pk_field:
+            raise UnsupportedField(field.field_name)
+        model_field = getattr(model, field.source, None)
+        model_field = getattr(model_field, 'field', None)
+        if not isinstance(model_field, ManyToManyField) or model_field.model is not model:
+            raise UnsupportedField(field.field_name)
+        return model_field.related_model, model_field.related_query_name()
+
+    def queryset(self, queryset, extra=()):
+        """Строки-словари с нужными колонками; extra — например, поля курсора пагинации."""
+        return queryset.prefetch_related(None).values(*dict.fromkeys([*self.columns, *extra]))
+
+    def related_pks(self, rows):
+        """{поле: {pk строки: [pk связанных]}} — по запросу на M2M-поле, как prefetch_related."""
+        pks = [row[self.pk_name] for row in rows]
+        related = {}
+        for name, (related_model, query_name) in self.many_to_many:
+            grouped = related[name] = {pk: [] for pk in pks}
+            if pks:
+                # Менеджер по умолчанию, как у instance.<поле>.all(): удалённые категории не попадут
+                for owner_pk, pk in related_model._default_manager.filter(**{f'{query_name}__in': pks}) \
+                        .values_list(query_name, 'pk'):
+                    grouped[owner_pk].append(pk)
+        return related
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        with timed('serialize'):
+            related = self.related_pks(rows) if self.many_to_many else {}
+            data = []
+            for row in rows:
+                item = {}
+                for name, source, convert in self.fields:
+                    value = row[source]
+                    item[name] = value if convert is None or value is None else convert(value)
+                for name, grouped in related.items():
+                    item[name] = grouped[row[self.pk_name]]
+                data.append(item)
+            return data
+
+
+_values_serializers = {}
+
+
+def values_serializer(serializer_class):
+    """ValuesSerializer для serializer_class (собирается один раз) или None, если его не построить."""
+    if serializer_class not in _values_serializers:
+        try:
+            _values_serializers[serializer_class] = ValuesSerializer(serializer_class())
+        except UnsupportedField:
+            _values_serializers[serializer_class] = None
+    return _values_serializers[serializer_class]
+
+
+def pagination_columns(paginator):
+    """Колонки, которые курсорная пагинация читает из строк страницы."""
+    cursor = getattr(paginator, 'cursor_paginator', paginator)
+    if not isinstance(cursor, CursorPagination):
+        return ()
+    ordering = (cursor.ordering,) if isinstance(cursor.ordering, str) else cursor.ordering
+    return tuple(name.lstrip('-') for name in ordering)
+
+
+class ValuesListMixin:
+    """list() generic-представления через ValuesSerializer, если serializer_class его допускает.
+
+    Ставится после ConditionalGetMixin/CachedResponseMixin: они оборачивают этот list().
+    """
+
+    def list(self, request, *args, **kwargs):
+        fast = values_serializer(self.get_serializer_class())
+        if fast is None:
+            return super().list(request, *args, **kwargs)
+
+        extra = pagination_columns(self.paginator)
+        ordering_fields = getattr(self, 'ordering_fields', None)
+        if isinstance(ordering_fields, (list, tuple)):
+            extra += tuple(ordering_fields)
+        rows = fast.queryset(self.filter_queryset(self.get_queryset()), extra)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.to_representation(page))
+        return Response(fast.to_representation(rows))
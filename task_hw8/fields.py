@@ -0,0 +1,65 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models.lookups import Exact
+from django.db.models.query_utils import DeferredAttribute
+
+
+def parse_choice(choices, value):
+    """Значение из choices по нему самому, его строке или метке (без учёта регистра).
+
+    Возвращает None, если ничего не подошло.
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        if text.isdigit():
+            value = int(text)
+        else:
+            text = text.casefold()
+            for choice, label in choices:
+                if str(label).casefold() == text:
+                    return choice
+            return None
+    for choice, label in choices:
+        if choice == value:
+            return choice
+    return None
+
+
+class LabeledChoiceDescriptor(DeferredAttribute):
+    # task.status = "Done" сразу превращается в число, как будто пришло из БД
+    def __set__(self, instance, value):
+        if isinstance(value, str):
+            parsed = parse_choice(self.field.choices, value)
+            if parsed is not None:
+                value = parsed
+        instance.__dict__[self.field.attname] = value
+
+
+class LabeledIntegerField(models.PositiveSmallIntegerField):
+    """Маленькое целое в БД, которое на входе принимает и метку из choices.
+
+    filter(status="In progress") и status__iexact="in progress" превращаются
+    в равенство по числу и используют обычный индекс.
+    """
+    descriptor_class = LabeledChoiceDescriptor
+
+    def to_python(self, value):
+        if isinstance(value, str):
+            parsed = parse_choice(self.choices, value)
+            if parsed is None:
+                raise ValidationError(
+                    self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value}
+                )
+            return parsed
+        return super().to_python(value)
+
+    def get_prep_value(self, value):
+        if isinstance(value, str):
+            value = self.to_python(value)
+        return super().get_prep_value(value)
+
+
+@LabeledIntegerField.register_lookup
+class LabeledIExact(Exact):
+    # Метка уже сравнивается без учёта регистра в get_prep_value
+    lookup_name = 'iexact'
@@ -0,0 +1,37 @@
+import django_filters
+from django import forms
+from django.core.exceptions import ValidationError
+
+from task_hw8.models import SubTask, Task, parse_status
+
+
+class StatusFormField(forms.CharField):
+    def to_python(self, value):
+        value = super().to_python(value)
+        if value in self.empty_values:
+            return None
+        status = parse_status(value)
+        if status is None:
+            raise ValidationError('Неизвестный статус: %(value)s', code='invalid_choice', params={'value': value})
+        return status
+
+
+class StatusFilter(django_filters.Filter):
+    """?status= принимает метку в любом регистре и фильтрует равенством по числу."""
+    field_class = StatusFormField
+
+
+class TaskFilter(django_filters.FilterSet):
+    status = StatusFilter()
+
+    class Meta:
+        model = Task
+        fields = ['status', 'deadline']
+
+
+class SubTaskFilter(django_filters.FilterSet):
+    status = StatusFilter()
+
+    class Meta:
+        model = SubTask
+        fields = ['status', 'deadline']
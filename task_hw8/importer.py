@@ -0,0 +1,335 @@
+"""Потоковый импорт задач с подзадачами и категориями из CSV или NDJSON.
+
+Файл читается построчно и обрабатывается чанками по chunk_size строк: в памяти
+одновременно не больше нескольких чанков, сколько бы строк ни было в файле.
+Разбор и проверка строк не трогают БД и могут идти в пуле процессов, запись —
+bulk_create задач, связей с категориями и подзадач, одна транзакция на чанк.
+
+CSV: колонки title, description, status, deadline, categories (имена через «;»)
+и subtasks (JSON-массив объектов с title, description, status, deadline).
+NDJSON: по объекту на строку с теми же ключами, categories — список имён.
+"""
+import codecs
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time
+from itertools import islice
+
+import django
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .bulk import bulk_insert
+from .cache import bump_user_versions
+from .models import Category, Status, SubTask, Task, parse_status
+from .stats import recompute_task_stats, refresh_category_task_counts
+
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+IMPORT_CHUNK_SIZE = 1000
+# Сколько ошибок по строкам возвращать; дальше — только счётчик
+MAX_REPORTED_ERRORS = 1000
+
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+CATEGORY_NAME_MAX_LENGTH = Category._meta.get_field('name').max_length
+
+
+def detect_format(filename, default=None):
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return default
+
+
+def read_rows(binary_stream, fmt):
+    """(номер строки, словарь) для каждой записи файла; битая строка NDJSON — (номер, None)."""
+    text = codecs.getreader('utf-8-sig')(binary_stream)
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_no, None
+            continue
+        yield line_no, row if isinstance(row, dict) else None
+
+
+def parse_deadline(value):
+    if isinstance(value, str) and value.strip():
+        value = value.strip()
+        deadline = parse_datetime(value)
+        if deadline is None:
+            day = parse_date(value)
+            if day is not None:
+                deadline = datetime.combine(day, time.min)
+        if deadline is not None:
+            return timezone.make_aware(deadline) if timezone.is_naive(deadline) else deadline
+    raise ValueError('Укажите дату в формате ISO 8601.')
+
+
+def clean_fields(data):
+    """Общие поля задачи и подзадачи: (значения, ошибки)."""
+    values, errors = {}, {}
+
+    title = data.get('title')
+    title = title.strip() if isinstance(title, str) else ''
+    if not title:
+        errors['title'] = ['Обязательное поле.']
+    elif len(title) > TITLE_MAX_LENGTH:
+        errors['title'] = [f'Не длиннее {TITLE_MAX_LENGTH} символов.']
+    values['title'] = title
+
+    description = data.get('description')
+    values['description'] = description if isinstance(description, str) and description.strip() else None
+
+    status = data.get('status')
+    if status in (None, ''):
+        values['status'] = Status.NEW
+    else:
+        values['status'] = parse_status(status)
+        if values['status'] is None:
+            errors['status'] = [f'Неизвестный статус «{status}».']
+
+    try:
+        values['deadline'] = parse_deadline(data.get('deadline'))
+    except ValueError as exc:
+        errors['deadline'] = [str(exc)]
+    return values, errors
+
+
+def clean_row(data):
+    """Строка файла -> (задача с categories и subtasks, ошибки). БД не используется."""
+    values, errors = clean_fields(data)
+
+    categories = data.get('categories') or []
+    if isinstance(categories, str):
+        categories = categories.split(';')
+    if not isinstance(categories, list) or not all(isinstance(name, str) for name in categories):
+        errors['categories'] = ['Ожидается список имён категорий.']
+        categories = []
+    categories = list(dict.fromkeys(name.strip() for name in categories if name.strip()))
+    if any(len(name) > CATEGORY_NAME_MAX_LENGTH for name in categories):
+        errors['categories'] = [f'Имя категории не длиннее {CATEGORY_NAME_MAX_LENGTH} символов.']
+    values['categories'] = categories
+
+    subtasks = data.get('subtasks') or []
+    if isinstance(subtasks, str):
+        try:
+            subtasks = json.loads(subtasks)
+        except ValueError:
+            subtasks = None
+    if not isinstance(subtasks, list) or not all(isinstance(item, dict) for item in subtasks):
+        errors['subtasks'] = ['Ожидается JSON-массив объектов.']
+        subtasks = []
+    values['subtasks'] = []
+    for index, item in enumerate(subtasks):
+        subtask, subtask_errors = clean_fields(item)
+        values['subtasks'].append(subtask)
+        for field, messages in subtask_errors.items():
+            errors[f'subtasks[{index}].{field}'] = messages
+    return values, errors
+
+
+def clean_chunk(rows):
+    """Проверяет чанк строк; функция верхнего уровня, чтобы её можно было отдать в пул процессов."""
+    items, errors = [], []
+    for line_no, data in rows:
+        if data is None:
+            errors.append({'line': line_no, 'errors': {'non_field_errors': ['Строка не является JSON-объектом.']}})
+            continue
+        values, row_errors = clean_row(data)
+        if row_errors:
+            errors.append({'line': line_no, 'errors': row_errors})
+        else:
+            items.append((line_no, values))
+    return items, errors
+
+
+def duplicate_title_errors(items):
+    """Повторы названий внутри чанка и совпадения с уже существующими строками.
+
+    Между чанками отдельного множества не держим: прошлые чанки уже записаны,
+    их названия находит тот же запрос к БД.
+    """
+    task_titles = [values['title'] for _, values in items]
+    subtask_titles = [subtask['title'] for _, values in items for subtask in values['subtasks']]
+    taken_tasks = set(Task.objects.filter(title__in=task_titles).values_list('title', flat=True))
+    taken_subtasks = set(SubTask.objects.filter(title__in=subtask_titles).values_list('title', flat=True))
+
+    seen_tasks, seen_subtasks, valid, errors = set(), set(), [], []
+    for line_no, values in items:
+        row_errors = {}
+        if values['title'] in taken_tasks or values['title'] in seen_tasks:
+            row_errors['title'] = ['Задача с таким названием уже существует.']
+        row_subtasks = set()
+        for index, subtask in enumerate(values['subtasks']):
+            title = subtask['title']
+            if title in taken_subtasks or title in seen_subtasks or title in row_subtasks:
+                row_errors[f'subtasks[{index}].title'] = ['Подзадача с таким названием уже существует.']
+            row_subtasks.add(title)
+        if row_errors:
+            errors.append({'line': line_no, 'errors': row_errors})
+            continue
+        seen_tasks.add(values['title'])
+        seen_subtasks.update(row_subtasks)
+        valid.append((line_no, values))
+    return valid, errors
+
+
+def resolve_categories(names, category_ids):
+    """Дополняет category_ids {имя: id}, создавая недостающие категории одним запросом.
+
+    Удалённая (soft delete) категория с тем же именем восстанавливается: имя уникально
+    и среди удалённых.
+    """
+    missing = [name for name in names if name not in category_ids]
+    if not missing:
+        return 0
+    found = dict(Category.all_objects.filter(name__in=missing).values_list('name', 'pk'))
+    deleted = Category.objects.deleted().filter(name__in=list(found))
+    if deleted.exists():
+        deleted.restore()
+    to_create = [Category(name=name) for name in missing if name not in found]
+    if to_create:
+        Category.objects.bulk_create(to_create, ignore_conflicts=True)
+        found.update(Category.all_objects.filter(name__in=[category.name for category in to_create])
+                     .values_list('name', 'pk'))
+    category_ids.update(found)
+    return len(to_create)
+
+
+class ImportResult:
+    def __init__(self):
+        self.processed = 0
+        self.tasks_created = 0
+        self.subtasks_created = 0
+        self.categories_created = 0
+        self.error_count = 0
+        self.errors = []
+        self.category_ids = set()
+
+    def add_errors(self, errors):
+        self.error_count += len(errors)
+        room = MAX_REPORTED_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend(errors[:room])
+
+    def progress(self):
+        return {
+            'processed': self.processed,
+            'tasks_created': self.tasks_created,
+            'subtasks_created': self.subtasks_created,
+            'categories_created': self.categories_created,
+            'error_count': self.error_count,
+        }
+
+    def as_dict(self):
+        return {**self.progress(), 'errors': self.errors,
+                'errors_truncated': self.error_count > len(self.errors)}
+
+
+def write_chunk(user, items, errors, category_ids, result):
+    """Записывает проверенные строки одного чанка в одной транзакции.
+
+    errors — ошибки проверки этого же чанка, в результат они попадают по порядку строк.
+    """
+    items, duplicate_errors = duplicate_title_errors(items)
+    result.add_errors(sorted(errors + duplicate_errors, key=lambda error: error['line']))
+    if not items:
+        return
+
+    try:
+        with transaction.atomic():
+            result.categories_created += resolve_categories(
+                {name for _, values in items for name in values['categories']}, category_ids
+            )
+            tasks = []
+            for _, values in items:
+                task = Task(owner=user, title=values['title'], description=values['description'],
+                            status=values['status'], deadline=values['deadline'])
+                task.sync_derived_fields()
+                tasks.append(task)
+            bulk_insert(Task, tasks, 'title')
+
+            links, subtasks = [], []
+            for task, (_, values) in zip(tasks, items):
+                links += [Task.categories.through(task_id=task.pk, category_id=category_ids[name])
+                          for name in values['categories']]
+                subtasks += [SubTask(owner=user, task_id=task.pk, **subtask) for subtask in values['subtasks']]
+            Task.categories.through.objects.bulk_create(links)
+            SubTask.objects.bulk_create(subtasks)
+    except IntegrityError as exc:
+        # Например, ту же задачу параллельно создал другой запрос: чанк не записан целиком
+        result.add_errors([{'line': line_no, 'errors': {'non_field_errors': [f'Ошибка записи: {exc}']}}
+                           for line_no, _ in items])
+        return
+
+    result.tasks_created += len(tasks)
+    result.subtasks_created += len(subtasks)
+    result.category_ids.update(link.category_id for link in links)
+
+
+def iter_chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def iter_cleaned(rows, chunk_size, workers):
+    """Проверенные чанки по порядку; с workers > 0 проверка идёт в пуле процессов.
+
+    В пул одновременно отдано не больше 2 * workers чанков, чтобы чтение файла
+    не убегало вперёд записи.
+    """
+    chunks = iter_chunks(rows, chunk_size)
+    if not workers:
+        for chunk in chunks:
+            yield len(chunk), clean_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=django.setup) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append((len(chunk), pool.submit(clean_chunk, chunk)))
+            if len(pending) >= 2 * workers:
+                size, future = pending.pop(0)
+                yield size, future.result()
+        for size, future in pending:
+            yield size, future.result()
+
+
+def import_tasks(user, binary_stream, fmt, chunk_size=IMPORT_CHUNK_SIZE, workers=0):
+    """Импортирует файл от имени user; после каждого чанка отдаёт ImportResult с прогрессом.
+
+    Последнее отданное значение — итог: пересчитаны статистика пользователя и
+    счётчики категорий, сброшен кеш ответов.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f'Неизвестный формат: {fmt}')
+
+    result, category_ids = ImportResult(), {}
+    try:
+        for size, (items, errors) in iter_cleaned(read_rows(binary_stream, fmt), chunk_size, workers):
+            result.processed += size
+            write_chunk(user, items, errors, category_ids, result)
+            yield result
+    except (UnicodeDecodeError, csv.Error) as exc:
+        result.add_errors([{'line': result.processed + 1, 'errors': {'non_field_errors': [f'Файл не читается: {exc}']}}])
+    finally:
+        # bulk_create не вызывает сигналы: счётчики и кеш обновляем по итогам
+        if result.tasks_created:
+            recompute_task_stats([user.pk])
+            if result.category_ids:
+                refresh_category_task_counts(result.category_ids)
+            bump_user_versions([user.pk])
+    yield result
@@ -0,0 +1,88 @@
+"""Логирование без файлового I/O в потоке запроса.
+
+Поток запроса только кладёт запись в очередь (QueuedHandler), форматирует и пишет
+её в файл фоновый QueueListener. SQL-логи дополнительно прореживает SQLSampleFilter.
+Фабрики queued_* подключаются в settings.LOGGING через '()'.
+"""
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+
+
+class QueuedHandler(QueueHandler):
+    """Отдаёт записи целевому обработчику в фоновом потоке.
+
+    Очередь ограничена: если запись не успевает за нагрузкой, новые записи
+    отбрасываются (счётчик dropped), а запрос не ждёт диск.
+    """
+
+    def __init__(self, target, max_queue_size=10000):
+        super().__init__(queue.Queue(max_queue_size))
+        self.target = target
+        self.dropped = 0
+        self.listener = QueueListener(self.queue, target, respect_handler_level=True)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        # formatter из LOGGING нужен тому, кто пишет в файл
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Стандартный prepare() форматирует сообщение прямо в потоке запроса.
+        # Очередь живёт в этом же процессе, поэтому запись можно передать как есть
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        # Вызывается logging.shutdown() и повторной настройкой LOGGING: дописываем очередь
+        if self.listener._thread is not None:
+            self.listener.stop()
+        self.target.close()
+        super().close()
+
+
+def queued_rotating_file(filename, max_bytes=10 * 1024 * 1024, backup_count=5, max_queue_size=10000):
+    """Ротация по размеру файла."""
+    return QueuedHandler(
+        RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True),
+        max_queue_size,
+    )
+
+
+def queued_timed_rotating_file(filename, when='midnight', backup_count=7, max_queue_size=10000):
+    """Ротация по времени."""
+    return QueuedHandler(
+        TimedRotatingFileHandler(filename, when=when, backupCount=backup_count, encoding='utf-8', delay=True),
+        max_queue_size,
+    )
+
+
+def queued_console(max_queue_size=10000):
+    return QueuedHandler(logging.StreamHandler(), max_queue_size)
+
+
+class SQLSampleFilter(logging.Filter):
+    """Пропускает долю sample_rate SQL-запросов и все запросы дольше slow_ms.
+
+    Медленные запросы поднимаются до WARNING, чтобы их было легко найти в логе.
+    Django пишет SQL в django.db.backends только при DEBUG=True.
+    """
+
+    def __init__(self, sample_rate=0.01, slow_ms=200):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    def filter(self, record):
+        duration = getattr(record, 'duration', None)
+        if duration is not None and duration * 1000 >= self.slow_ms:
+            record.levelno = logging.WARNING
+            record.levelname = logging.getLevelName(logging.WARNING)
+            return True
+        return random.random() < self.sample_rate
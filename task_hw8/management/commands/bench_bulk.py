@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from task_hw8.models import Category
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает создание N задач по одной через /tasks/ и пакетом через /tasks/bulk/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500)
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        count, batch_size = options['count'], options['batch_size']
+        deadline = (timezone.now() + timedelta(days=7)).isoformat()
+        hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '')]
+        host = hosts[0].lstrip('.') if hosts else 'localhost'
+
+        # Всё выполняется в транзакции, которая откатывается в конце
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create(username='bench-bulk-user')
+                category = Category.objects.create(name='bench-bulk-category')
+
+                def payload(prefix, i):
+                    return {'title': f'{prefix}-{i}', 'status': 'New', 'deadline': deadline,
+                            'categories': [category.pk]}
+
+                client = APIClient(HTTP_HOST=host)
+                client.force_authenticate(user)
+
+                started = time.perf_counter()
+                for i in range(count):
+                    response = client.post('/tasks/', payload('single', i), format='json')
+                    assert response.status_code == 201, response.content
+                single = time.perf_counter() - started
+
+                started = time.perf_counter()
+                for offset in range(0, count, batch_size):
+                    batch = [payload('bulk', i) for i in range(offset, min(offset + batch_size, count))]
+                    response = client.post('/tasks/bulk/', batch, format='json')
+                    assert response.status_code == 201, response.content
+                bulk = time.perf_counter() - started
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f'По одной: {single:.2f} с, {count / single:.0f} задач/с')
+        self.stdout.write(f'Пакетами по {batch_size}: {bulk:.2f} с, {count / bulk:.0f} задач/с')
+        self.stdout.write(self.style.SUCCESS(f'Ускорение: x{single / bulk:.1f}'))
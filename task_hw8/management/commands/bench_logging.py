@@ -0,0 +1,102 @@
+import copy
+import logging
+import logging.config
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection, transaction
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from task_hw8.models import Task
+
+
+class Rollback(Exception):
+    pass
+
+
+def logging_profiles(log_dir):
+    """Три варианта LOGGING: без SQL-логов, прежний синхронный FileHandler и текущий из settings."""
+    current = copy.deepcopy(settings.LOGGING)
+    for handler in current['handlers'].values():
+        if 'filename' in handler:
+            handler['filename'] = os.path.join(log_dir, os.path.basename(handler['filename']))
+
+    sync = copy.deepcopy(current)
+    sync.pop('filters', None)
+    for name in ('http_file', 'db_file'):
+        sync['handlers'][name] = {
+            'class': 'logging.FileHandler',
+            'filename': current['handlers'][name]['filename'],
+            'formatter': 'verbose',
+        }
+
+    off = copy.deepcopy(sync)
+    off['loggers']['django.db.backends']['level'] = 'CRITICAL'
+    return {'без SQL-логов': off, 'FileHandler': sync, 'очередь + выборка': current}
+
+
+class Command(BaseCommand):
+    help = ('Замеряет накладные расходы логирования на запрос: GET /tasks/ с выводом SQL '
+            'в лог (как при DEBUG) для прежней и текущей настройки LOGGING')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument('--tasks', type=int, default=50)
+        parser.add_argument('--rounds', type=int, default=3, help='профили чередуются, берётся лучший раунд')
+
+    def measure(self, client, total):
+        started = time.perf_counter()
+        for i in range(total):
+            # Уникальный параметр — мимо кеша ответов, каждый запрос идёт в БД
+            client.get('/tasks/', {'bench': i})
+        return (time.perf_counter() - started) / total * 1000
+
+    def handle(self, *args, **options):
+        deadline = timezone.now() + timedelta(days=7)
+        # Как в TestCase: иначе конец запроса закроет соединение вместе с транзакцией
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        connection.force_debug_cursor = True
+        try:
+            with tempfile.TemporaryDirectory() as log_dir, \
+                    override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                with transaction.atomic():
+                    user = get_user_model().objects.create(username='bench-logging-user')
+                    Task.objects.bulk_create([
+                        Task(owner=user, title=f'Задача {i}', status='New', deadline=deadline)
+                        for i in range(options['tasks'])
+                    ])
+                    client = Client()
+                    client.force_login(user)
+
+                    profiles = logging_profiles(log_dir)
+                    best = {}
+                    for _ in range(options['rounds']):
+                        for name, config in profiles.items():
+                            logging.config.dictConfig(config)
+                            self.measure(client, 20)
+                            per_request = self.measure(client, options['requests'])
+                            best[name] = min(best.get(name, per_request), per_request)
+
+                    baseline = next(iter(best.values()))
+                    for name, per_request in best.items():
+                        self.stdout.write(
+                            f'{name:<20} {per_request:7.2f} мс/запрос, '
+                            f'логирование +{per_request - baseline:.2f} мс'
+                        )
+                    # Закрываем файловые обработчики до удаления временной папки
+                    logging.config.dictConfig(settings.LOGGING)
+                    raise Rollback
+        except Rollback:
+            pass
+        finally:
+            connection.force_debug_cursor = False
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
@@ -0,0 +1,74 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from task_hw8.benchmarks import vocabulary
+from task_hw8.models import Task
+from task_hw8.search import FullTextSearchFilter
+from task_hw8.views import TaskListCreateView
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает ?search= через LIKE и через полнотекстовый индекс на N задачах'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('terms', nargs='*', default=['invoice', 'релиз', 'budget review', 'depl'])
+
+    def measure(self, backend, request, queryset, view, repeat):
+        page_size = api_settings.PAGE_SIZE or 10
+        started = time.perf_counter()
+        for _ in range(repeat):
+            filtered = backend().filter_queryset(request, queryset, view)
+            total = filtered.count()
+            list(filtered[:page_size])
+        return (time.perf_counter() - started) / repeat * 1000, total
+
+    def handle(self, *args, **options):
+        count, repeat = options['count'], options['repeat']
+        rng = random.Random(0)
+        words = vocabulary(rng, 3000)
+        deadline = timezone.now() + timedelta(days=7)
+        factory = APIRequestFactory()
+
+        # Данные создаются в транзакции, которая откатывается в конце
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create(username='bench-search-user')
+                for offset in range(0, count, 5000):
+                    Task.objects.bulk_create([
+                        Task(owner=user, status='New', deadline=deadline,
+                             title=' '.join(rng.sample(words, 3)) + f' {i}',
+                             description=' '.join(rng.choices(words, k=20)))
+                        for i in range(offset, min(offset + 5000, count))
+                    ])
+                self.stdout.write(f'Создано задач: {count}')
+
+                view = TaskListCreateView()
+                view.search_fields = TaskListCreateView.search_fields
+                queryset = Task.objects.filter(owner=user).order_by('-created_at')
+                for term in options['terms']:
+                    request = Request(factory.get('/tasks/', {'search': term}))
+                    like_ms, like_total = self.measure(SearchFilter, request, queryset, view, repeat)
+                    fts_ms, fts_total = self.measure(FullTextSearchFilter, request, queryset, view, repeat)
+                    self.stdout.write(
+                        f'"{term}": LIKE {like_ms:.1f} мс ({like_total}), '
+                        f'полнотекстовый {fts_ms:.1f} мс ({fts_total}), x{like_ms / fts_ms:.1f}'
+                    )
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from task_hw8.fast_serializers import values_serializer
+from task_hw8.models import SubTask, Task
+from task_hw8.optimizers import optimize_queryset
+from task_hw8.serializers import SubTaskSerializer, TaskCreateSerializer, TaskSerializer
+
+
+CASES = (
+    (TaskSerializer, Task),
+    (TaskCreateSerializer, Task),
+    (SubTaskSerializer, SubTask),
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает строки в секунду для списков: ModelSerializer по объектам модели '
+            'и ValuesSerializer по values(), вместе с запросом к БД. Заодно проверяет, '
+            'что JSON обоих путей совпадает. Данные удобно создать командой generate_data')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--rounds', type=int, default=5, help='пути чередуются, берётся лучший раунд')
+
+    def model_path(self, serializer_class, queryset, rows):
+        objs = list(optimize_queryset(queryset, serializer_class())[:rows])
+        return serializer_class(objs, many=True).data
+
+    def values_path(self, serializer_class, queryset, rows):
+        fast = values_serializer(serializer_class)
+        return fast.to_representation(fast.queryset(queryset)[:rows])
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        for serializer_class, model in CASES:
+            queryset = model.objects.order_by('-created_at', '-pk')
+            rows = min(options['rows'], queryset.count())
+            if not rows:
+                raise CommandError('В базе нет задач, запустите generate_data')
+            if values_serializer(serializer_class) is None:
+                raise CommandError(f'{serializer_class.__name__}: быстрый путь не поддерживается')
+
+            if renderer.render(self.model_path(serializer_class, queryset, rows)) != \
+                    renderer.render(self.values_path(serializer_class, queryset, rows)):
+                raise CommandError(f'{serializer_class.__name__}: JSON путей различается')
+
+            best = {}
+            for _ in range(options['rounds']):
+                for name, path in (('ModelSerializer', self.model_path), ('values()', self.values_path)):
+                    started = time.perf_counter()
+                    path(serializer_class, queryset, rows)
+                    elapsed = time.perf_counter() - started
+                    best[name] = min(best.get(name, elapsed), elapsed)
+
+            speedup = best['ModelSerializer'] / best['values()']
+            self.stdout.write(f'{serializer_class.__name__} ({rows} строк, JSON совпадает)')
+            for name, elapsed in best.items():
+                self.stdout.write(f'  {name:<16} {rows / elapsed:>10.0f} строк/с  {elapsed * 1000:8.1f} мс')
+            self.stdout.write(self.style.SUCCESS(f'  ускорение ×{speedup:.1f}'))
@@ -0,0 +1,208 @@
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Count
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from task_hw8.metrics import RequestTimings
+from task_hw8.models import Category, SubTask, Task
+
+
+# Служебные и только пишущие маршруты: GET на них ничего не говорит о производительности API
+DEFAULT_EXCLUDE = ('admin/', 'api/token/', 'api/logout/', 'test-log/')
+
+
+def iter_patterns(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield prefix + str(pattern.pattern), pattern
+
+
+def pattern_model(pattern):
+    """Модель, чей pk подставляется в маршрут; для функций-представлений — Task."""
+    view_class = getattr(pattern.callback, 'cls', None) or getattr(pattern.callback, 'view_class', None)
+    queryset = getattr(view_class, 'queryset', None)
+    if queryset is not None:
+        return queryset.model
+    serializer_class = getattr(view_class, 'serializer_class', None)
+    meta = getattr(serializer_class, 'Meta', None)
+    return getattr(meta, 'model', Task)
+
+
+def route_label(route):
+    # Из регулярных выражений роутера DRF убираем только якоря ^ и $
+    return '/'.join(part.removeprefix('^').removesuffix('$') for part in route.split('/'))
+
+
+def percentile(values, q):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[q - 1]
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=settings.BASE_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Прогоняет GET по всем маршрутам DjangoHW/urls.py тестовым клиентом от имени '
+            'пользователя и выводит p50/p95/p99 и число SQL-запросов в JSON. '
+            'Данные удобно создать командой generate_data')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='по умолчанию — пользователь с наибольшим числом задач')
+        parser.add_argument('--requests', type=int, default=50, help='запросов на маршрут')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--cache', action='store_true',
+                            help='не обходить кеш ответов (по умолчанию у каждого запроса уникальный параметр)')
+        parser.add_argument('--exclude', action='append', help='префикс маршрута, можно несколько раз')
+        parser.add_argument('--only', action='append', help='мерить только маршруты с этим префиксом')
+        parser.add_argument('--output', help='файл для JSON, иначе stdout')
+        parser.add_argument('--compare', help='JSON предыдущего прогона: вывести изменение p50')
+
+    def pick_user(self, username):
+        users = get_user_model().objects
+        if username:
+            try:
+                return users.get(username=username)
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'Пользователь {username} не найден')
+        user = users.annotate(task_total=Count('tasks')).order_by('-task_total').first()
+        if user is None:
+            raise CommandError('В базе нет пользователей, запустите generate_data')
+        return user
+
+    def sample_pks(self, user):
+        return {
+            Task: Task.objects.filter(owner=user).values_list('pk', flat=True).first(),
+            SubTask: SubTask.objects.filter(owner=user).values_list('pk', flat=True).first(),
+            Category: Category.objects.values_list('pk', flat=True).first(),
+        }
+
+    def routes(self, options, sample_pks):
+        """(маршрут, URL) для каждого шаблона; маршруты с параметрами собираются через reverse()."""
+        exclude = options['exclude'] or DEFAULT_EXCLUDE
+        routes, seen = [], set()
+        for route, pattern in iter_patterns(get_resolver().url_patterns):
+            if route.startswith(tuple(exclude)) or (options['only'] and not route.startswith(tuple(options['only']))):
+                continue
+            groups = set(pattern.pattern.regex.groupindex)
+            if 'format' in groups:
+                # Варианты .json/.yaml тех же представлений
+                continue
+            if groups:
+                pk = sample_pks.get(pattern_model(pattern))
+                if not pattern.name or groups != {'pk'} or pk is None:
+                    continue
+                url = reverse(pattern.name, kwargs={'pk': pk})
+            else:
+                url = '/' + route_label(route)
+            if url not in seen:
+                seen.add(url)
+                routes.append((route_label(route), url))
+        return routes
+
+    def measure(self, client, url, options):
+        for i in range(options['warmup']):
+            client.get(url, {'bench': f'warmup-{i}'} if not options['cache'] else None)
+
+        # Счётчик через execute_wrapper: connection.queries сбрасывается в начале каждого запроса
+        timings = RequestTimings()
+        with ExitStack() as stack:
+            for alias_connection in connections.all():
+                stack.enter_context(alias_connection.execute_wrapper(timings))
+            response = client.get(url, {'bench': 'queries'} if not options['cache'] else None)
+        if response.status_code == 405:
+            return {'status': response.status_code, 'skipped': 'GET не поддерживается'}
+
+        latencies = []
+        for i in range(options['requests']):
+            params = None if options['cache'] else {'bench': i}
+            started = time.perf_counter()
+            client.get(url, params)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return {
+            'status': response.status_code,
+            'queries': timings.sql_count,
+            'bytes': len(response.content) if not response.streaming else None,
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+        }
+
+    def handle(self, *args, **options):
+        user = self.pick_user(options['username'])
+        hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '')]
+        client = APIClient(HTTP_HOST=hosts[0].lstrip('.') if hosts else 'localhost', REMOTE_ADDR='127.0.0.1')
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        client.force_login(user)
+
+        # Ответы 403/405 иначе пишутся в лог на каждый запрос
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        results = []
+        try:
+            for route, url in self.routes(options, self.sample_pks(user)):
+                result = {'route': route, 'url': url, **self.measure(client, url, options)}
+                results.append(result)
+                if 'skipped' in result:
+                    self.stderr.write(f'{route:<45} {result["status"]} {result["skipped"]}')
+                else:
+                    self.stderr.write(f'{route:<45} {result["status"]} p50 {result["p50_ms"]:8.2f} мс  '
+                                      f'p95 {result["p95_ms"]:8.2f} мс  SQL {result["queries"]}')
+        finally:
+            request_logger.setLevel(level)
+
+        report = {
+            'started_at': timezone.now().isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'user': user.username,
+            'data': {'tasks': Task.objects.count(), 'subtasks': SubTask.objects.count(),
+                     'user_tasks': Task.objects.filter(owner=user).count()},
+            'requests_per_route': options['requests'],
+            'response_cache': options['cache'],
+            'routes': results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def compare(self, path, results):
+        with open(path, encoding='utf-8') as file:
+            previous = {route['route']: route for route in json.load(file)['routes']}
+        for result in results:
+            before = previous.get(result['route'])
+            if before and before.get('p50_ms') and 'p50_ms' in result:
+                change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+                self.stderr.write(f'{result["route"]:<45} p50 {before["p50_ms"]:.2f} → {result["p50_ms"]:.2f} мс '
+                                  f'({change:+.0f}%), SQL {before["queries"]} → {result["queries"]}')
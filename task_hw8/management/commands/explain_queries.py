@@ -0,0 +1,72 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from task_hw8.models import Status, SubTask, Task, TaskStats
+
+
+# Признаки полного сканирования или сортировки во временной таблице для каждого бэкенда.
+BAD_PLAN_PATTERNS = {
+    'sqlite': [r'\bSCAN\b', r'TEMP B-TREE'],
+    'mysql': [r'\bALL\b', r'Using filesort', r'Using temporary'],
+    'postgresql': [r'Seq Scan', r'\bSort\b'],
+}
+
+
+def endpoint_querysets(owner_id):
+    """Querysets, которые строят эндпоинты из task_hw8/views.py для одного пользователя."""
+    now = timezone.now()
+    tasks = Task.objects.filter(owner_id=owner_id)
+    subtasks = SubTask.objects.filter(owner_id=owner_id)
+
+    return [
+        ('TaskListCreateView', tasks.order_by('-created_at', '-id')),
+        ('TaskListCreateView?status', tasks.filter(status=Status.NEW).order_by('-created_at', '-id')),
+        ('TaskListCreateView?deadline', tasks.filter(deadline=now).order_by('-created_at', '-id')),
+        ('SubTaskListCreateView', subtasks.order_by('-created_at', '-id')),
+        ('SubTaskListCreateView?status', subtasks.filter(status=Status.NEW).order_by('-created_at', '-id')),
+        ('SubTaskListCreateView?deadline', subtasks.filter(deadline=now).order_by('-created_at', '-id')),
+        ('SubTaskListView', subtasks.order_by('-created_at', '-id')),
+        ('SubTaskListView?status', subtasks.filter(status=Status.IN_PROGRESS).order_by('-created_at', '-id')),
+        ('get_all_tasks', tasks),
+        ('get_tasks_by_weekday', tasks.filter(deadline_weekday=0).order_by('-created_at', '-id')),
+        # Счётчики по статусам — одна строка TaskStats, как в get_task_stats() (.first())
+        ('task_statistics:stats', TaskStats.objects.filter(owner_id=owner_id).order_by('pk')[:1]),
+        # count() сбрасывает сортировку, поэтому и здесь она не нужна
+        ('task_statistics:overdue', tasks.filter(deadline__lt=now).exclude(status=Status.DONE).order_by()),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Запускает EXPLAIN для querysets эндпоинтов и падает, если план содержит полный скан или filesort'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', type=int, default=1, help='id пользователя для фильтра owner')
+        parser.add_argument('--verbose-plans', action='store_true', help='печатать полный план каждого запроса')
+
+    def handle(self, *args, **options):
+        patterns = BAD_PLAN_PATTERNS.get(connection.vendor)
+        if patterns is None:
+            raise CommandError(f'Бэкенд {connection.vendor} не поддерживается')
+
+        failures = []
+        for name, queryset in endpoint_querysets(options['owner']):
+            plan = queryset.explain()
+            bad_lines = [
+                line for line in plan.splitlines()
+                if any(re.search(pattern, line) for pattern in patterns)
+            ]
+            if bad_lines:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'FAIL {name}'))
+                for line in bad_lines:
+                    self.stdout.write(f'    {line}')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'OK   {name}'))
+            if options['verbose_plans']:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f'Полный скан или сортировка без индекса: {", ".join(failures)}')
@@ -0,0 +1,119 @@
+import math
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from task_hw8.benchmarks import vocabulary
+from task_hw8.bulk import bulk_insert
+from task_hw8.models import Category, Status, SubTask, Task
+from task_hw8.stats import recompute_task_stats, refresh_category_task_counts
+
+
+# Доли статусов примерно как в живой базе: большая часть задач закрыта
+STATUS_WEIGHTS = {
+    Status.NEW: 20, Status.IN_PROGRESS: 20, Status.PENDING: 8,
+    Status.BLOCKED: 5, Status.DONE: 40, Status.ARCHIVED: 7,
+}
+# Сколько категорий у задачи: 0, 1, 2, 3
+CATEGORY_COUNT_WEIGHTS = (20, 45, 25, 10)
+
+
+def subtask_count(rng, mean):
+    """Геометрическое распределение со средним mean: чаще 0–2, изредка десяток."""
+    if mean <= 0:
+        return 0
+    return min(int(rng.expovariate(math.log1p(1 / mean))), 20)
+
+
+class Command(BaseCommand):
+    help = ('Быстро создаёт пользователей, категории, задачи и подзадачи через bulk_create '
+            'с правдоподобными распределениями: у немногих пользователей много задач, '
+            'популярные категории встречаются чаще, большая часть задач закрыта')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--tasks', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=30)
+        parser.add_argument('--subtasks-per-task', type=float, default=2.0, help='в среднем')
+        parser.add_argument('--prefix', default='gen', help='префикс имён, чтобы не пересекаться с живыми данными')
+        parser.add_argument('--password', default='bench-password', help='пароль всех созданных пользователей')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        prefix, batch_size = options['prefix'], options['batch_size']
+        if get_user_model().objects.filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(f'Данные с префиксом "{prefix}" уже есть, укажите другой --prefix')
+
+        rng = random.Random(options['seed'])
+        words = vocabulary(rng, 2000)
+        now = timezone.now()
+
+        with transaction.atomic():
+            # Хеш пароля считается один раз: make_password на каждого занял бы минуты
+            password = make_password(options['password'])
+            users = bulk_insert(get_user_model(), [
+                get_user_model()(username=f'{prefix}-{i:06d}', password=password)
+                for i in range(options['users'])
+            ], 'username', batch_size)
+            # Распределение Парето: немногие активные пользователи владеют большей частью задач
+            user_weights = [rng.paretovariate(1.2) for _ in users]
+
+            categories = bulk_insert(Category, [
+                Category(name=f'{rng.choice(words)} {prefix}-{i}') for i in range(options['categories'])
+            ], 'name', batch_size)
+            # Закон Ципфа: k-я по популярности категория встречается в ~1/k раз реже первой
+            category_weights = [1 / rank for rank in range(1, len(categories) + 1)]
+
+            statuses, status_weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+            created_tasks = created_subtasks = 0
+            for offset in range(0, options['tasks'], batch_size):
+                count = min(batch_size, options['tasks'] - offset)
+                owners = rng.choices(users, user_weights, k=count)
+                tasks = []
+                for i, owner in enumerate(owners, start=offset):
+                    task = Task(
+                        owner=owner,
+                        title=f'{" ".join(rng.sample(words, 3))} {prefix}-{i}',
+                        description=' '.join(rng.choices(words, k=rng.randint(10, 40))) if rng.random() < 0.6 else None,
+                        status=rng.choices(statuses, status_weights)[0],
+                        deadline=now + timedelta(days=rng.gauss(7, 20), seconds=rng.randint(0, 86399)),
+                    )
+                    task.sync_derived_fields()
+                    tasks.append(task)
+                bulk_insert(Task, tasks, 'title', batch_size)
+
+                links, subtasks = [], []
+                for task in tasks:
+                    size = rng.choices(range(len(CATEGORY_COUNT_WEIGHTS)), CATEGORY_COUNT_WEIGHTS)[0]
+                    chosen = {category.pk for category in rng.choices(categories, category_weights, k=size)}
+                    links += [Task.categories.through(task_id=task.pk, category_id=pk) for pk in chosen]
+
+                    for n in range(subtask_count(rng, options['subtasks_per_task'])):
+                        subtasks.append(SubTask(
+                            owner_id=task.owner_id, task_id=task.pk,
+                            title=f'{" ".join(rng.sample(words, 2))} {prefix}-{task.pk}-{n}',
+                            # У закрытой задачи и подзадачи закрыты
+                            status=task.status if task.status in (Status.DONE, Status.ARCHIVED)
+                            else rng.choices(statuses, status_weights)[0],
+                            deadline=task.deadline - timedelta(days=rng.uniform(0, 5)),
+                        ))
+                Task.categories.through.objects.bulk_create(links, batch_size=batch_size)
+                SubTask.objects.bulk_create(subtasks, batch_size=batch_size)
+                created_tasks += len(tasks)
+                created_subtasks += len(subtasks)
+                self.stdout.write(f'Задач: {created_tasks}, подзадач: {created_subtasks}')
+
+            # bulk_create не вызывает сигналы, поэтому счётчики пересчитываются целиком
+            recompute_task_stats([user.pk for user in users])
+            refresh_category_task_counts([category.pk for category in categories])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, категорий {len(categories)}, '
+            f'задач {created_tasks}, подзадач {created_subtasks}'
+        ))
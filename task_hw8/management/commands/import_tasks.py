@@ -0,0 +1,49 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from task_hw8.importer import IMPORT_CHUNK_SIZE, IMPORT_FORMATS, detect_format, import_tasks
+
+
+class Command(BaseCommand):
+    help = ('Импортирует задачи с подзадачами и категориями из CSV или NDJSON '
+            'от имени пользователя; формат описан в task_hw8/importer.py')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help='username владельца задач')
+        parser.add_argument('--type', choices=IMPORT_FORMATS, help='по умолчанию — по расширению файла')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, default=0, help='процессов для разбора и проверки строк')
+        parser.add_argument('--show-errors', type=int, default=20, help='сколько ошибок по строкам вывести')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Пользователь {options["user"]} не найден')
+        fmt = options['type'] or detect_format(options['path'])
+        if fmt is None:
+            raise CommandError('Не удалось определить формат по расширению, укажите --type')
+
+        started = time.perf_counter()
+        result, last = None, None
+        with open(options['path'], 'rb') as file:
+            for result in import_tasks(user, file, fmt, options['chunk_size'], options['workers']):
+                progress = result.progress()
+                if progress == last:
+                    continue
+                last = progress
+                self.stdout.write(
+                    f'Строк: {progress["processed"]}, задач: {progress["tasks_created"]}, '
+                    f'подзадач: {progress["subtasks_created"]}, ошибок: {progress["error_count"]}'
+                )
+
+        for error in result.errors[:options['show_errors']]:
+            self.stderr.write(f'Строка {error["line"]}: {error["errors"]}')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {elapsed:.1f} с: задач {result.tasks_created}, подзадач {result.subtasks_created}, '
+            f'новых категорий {result.categories_created}, ошибок {result.error_count}'
+        ))
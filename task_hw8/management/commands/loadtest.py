@@ -0,0 +1,139 @@
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def process_rss(pid):
+    """RSS процесса и всех его потомков в МБ (воркеры gunicorn/uvicorn — дочерние процессы)."""
+    total, pids = 0, [pid]
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f'/proc/{current}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+            for tid in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{tid}/children') as children:
+                    pids.extend(int(child) for child in children.read().split())
+        except FileNotFoundError:
+            continue
+    return total / 1024
+
+
+class Target:
+    def __init__(self, name, base_url, path, pid):
+        self.name = name
+        self.url = urlsplit(base_url)
+        self.path = path
+        self.pid = pid
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает WSGI- и ASGI-развёртывание под растущей конкурентностью. '
+            'Серверы запускаются заранее с одинаковым числом воркеров, см. DjangoHW/asgi.py')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', help='например http://127.0.0.1:8000')
+        parser.add_argument('--asgi-url', help='например http://127.0.0.1:8001')
+        parser.add_argument('--wsgi-pid', type=int, help='pid мастер-процесса для замера памяти')
+        parser.add_argument('--asgi-pid', type=int)
+        parser.add_argument('--wsgi-path', default='/tasks/')
+        parser.add_argument('--asgi-path', default='/async/tasks/')
+        parser.add_argument('--concurrency', default='1,10,50,100')
+        parser.add_argument('--requests', type=int, default=500, help='запросов на каждый уровень')
+        parser.add_argument('--token', help='access-токен; иначе берётся по --username/--password')
+        parser.add_argument('--username')
+        parser.add_argument('--password')
+
+    def obtain_token(self, target, username, password):
+        connection = HTTPConnection(target.url.hostname, target.url.port or 80, timeout=30)
+        body = json.dumps({'username': username, 'password': password})
+        connection.request('POST', '/api/token/', body, {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        data = response.read()
+        if response.status != 200:
+            raise CommandError(f'Не удалось получить токен: {response.status} {data[:200]!r}')
+        return json.loads(data)['access']
+
+    def run_level(self, target, token, concurrency, total):
+        latencies, errors = [], 0
+        lock = threading.Lock()
+        counter = iter(range(total))
+        headers = {'Authorization': f'Bearer {token}'}
+
+        def connect():
+            return HTTPConnection(target.url.hostname, target.url.port or 80, timeout=60)
+
+        def worker():
+            nonlocal errors
+            # Своё keep-alive соединение на каждый поток клиента
+            connection = connect()
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        break
+                started = time.perf_counter()
+                try:
+                    connection.request('GET', target.path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status == 200
+                except OSError:
+                    ok = False
+                    connection.close()
+                    connection = connect()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors += 1
+            connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+        duration = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'rps': len(latencies) / duration,
+            'p50': statistics.median(latencies) * 1000 if latencies else 0,
+            'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0,
+            'errors': errors,
+            'rss': process_rss(target.pid) if target.pid else None,
+        }
+
+    def handle(self, *args, **options):
+        targets = [
+            Target(name, options[f'{name}_url'], options[f'{name}_path'], options[f'{name}_pid'])
+            for name in ('wsgi', 'asgi') if options[f'{name}_url']
+        ]
+        if not targets:
+            raise CommandError('Укажите --wsgi-url и/или --asgi-url')
+
+        token = options['token']
+        if not token:
+            if not options['username']:
+                raise CommandError('Нужен --token или --username/--password')
+            token = self.obtain_token(targets[0], options['username'], options['password'])
+
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        self.stdout.write(f'{"сервер":<6} {"конк.":>6} {"rps":>8} {"p50, мс":>9} {"p95, мс":>9} {"ошибки":>7} {"RSS, МБ":>8}')
+        for concurrency in levels:
+            for target in targets:
+                result = self.run_level(target, token, concurrency, options['requests'])
+                rss = f'{result["rss"]:.0f}' if result['rss'] is not None else '-'
+                self.stdout.write(
+                    f'{target.name:<6} {concurrency:>6} {result["rps"]:>8.0f} {result["p50"]:>9.1f} '
+                    f'{result["p95"]:>9.1f} {result["errors"]:>7} {rss:>8}'
+                )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from task_hw8.stats import recompute_task_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает таблицу TaskStats одним GROUP BY по задачам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', type=int, action='append', dest='owners',
+                            help='id пользователя (можно указать несколько раз)')
+
+    def handle(self, *args, **options):
+        stats = recompute_task_stats(options['owners'])
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано пользователей: {len(stats)}'))
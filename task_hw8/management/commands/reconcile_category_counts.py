@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from task_hw8.stats import refresh_category_task_counts
+
+
+class Command(BaseCommand):
+    help = 'Сверяет Category.task_count с through-таблицей задач (для запуска по расписанию)'
+
+    def handle(self, *args, **options):
+        updated = refresh_category_task_counts()
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано категорий: {updated}'))
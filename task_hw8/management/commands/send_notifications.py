@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from task_hw8.notifications import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Фоновый воркер: отправляет уведомления из outbox пачками через одно почтовое соединение'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='обработать очередь один раз и выйти')
+        parser.add_argument('--interval', type=float, default=5, help='пауза между проверками, с')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--coalesce-seconds', type=int, default=settings.NOTIFICATION_COALESCE_SECONDS)
+        parser.add_argument('--max-delay-seconds', type=int, default=settings.NOTIFICATION_MAX_DELAY_SECONDS)
+
+    def handle(self, *args, **options):
+        mail_connection = get_connection()
+        try:
+            while True:
+                try:
+                    mail_connection.open()
+                    processed = self.drain(mail_connection, options)
+                except Exception as exc:
+                    # Например, SMTP оборвал соединение — переподключимся на следующей итерации
+                    self.stderr.write(f'Ошибка отправки: {exc}')
+                    mail_connection.close()
+                    processed = 0
+                    if options['once']:
+                        raise
+
+                if options['once']:
+                    break
+                if not processed:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            mail_connection.close()
+
+    def drain(self, mail_connection, options):
+        total = 0
+        while True:
+            processed = drain_outbox(
+                mail_connection,
+                batch_size=options['batch_size'],
+                coalesce_seconds=options['coalesce_seconds'],
+                max_delay_seconds=options['max_delay_seconds'],
+            )
+            total += processed
+            if processed < options['batch_size']:
+                break
+        if total:
+            self.stdout.write(f'Обработано уведомлений: {total}')
+        return total
@@ -0,0 +1,30 @@
+import sqlite3
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Копирует SQLite-базу default в SQLite-реплики из DATABASE_REPLICA_URLS. '
+            'Нужно только для локальной проверки роутера: настоящие реплики MySQL '
+            'получают данные репликацией')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены: задайте DATABASE_REPLICA_URLS')
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Копирование поддерживается только для SQLite')
+
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            replica = connections[alias]
+            if replica.vendor != 'sqlite':
+                raise CommandError(f'{alias}: реплика не SQLite')
+            replica.close()
+            # backup() копирует согласованный снимок, в том числе FTS-таблицы и триггеры
+            with closing(sqlite3.connect(replica.settings_dict['NAME'])) as target:
+                primary.connection.backup(target)
+            self.stdout.write(self.style.SUCCESS(f'{alias}: скопировано из {DEFAULT_DB_ALIAS}'))
@@ -1,5 +1,50 @@
 from django.db import models
+from django.dispatch import Signal
+from django.utils import timezone
 
-class SoftDeleteManager(models.Manager):
+
+# update() не отправляет post_save, поэтому мягкое удаление и восстановление
+# сообщают о себе отдельным сигналом (sender — модель, pks — затронутые строки)
+soft_delete_changed = Signal()
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def delete(self):
+        # Один UPDATE на весь queryset вместо загрузки и save() каждой строки;
+        # pk запоминаем заранее — обработчикам сигнала нужны связанные строки
+        pks = list(self.values_list('pk', flat=True))
+        count = self.model._base_manager.filter(pk__in=pks).update(is_deleted=True, deleted_at=timezone.now())
+        soft_delete_changed.send(sender=self.model, pks=pks)
+        return count
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def hard_delete(self):
+        return super().delete()
+
+    hard_delete.alters_data = True
+    hard_delete.queryset_only = True
+
+    def restore(self):
+        pks = list(self.values_list('pk', flat=True))
+        count = self.model._base_manager.filter(pk__in=pks).update(is_deleted=False, deleted_at=None)
+        soft_delete_changed.send(sender=self.model, pks=pks)
+        return count
+
+    restore.alters_data = True
+
+    def alive(self):
+        return self.filter(is_deleted=False)
+
+    def deleted(self):
+        return self.filter(is_deleted=True)
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(is_deleted=False)
+
+    def deleted(self):
+        """Только мягко удалённые строки — например, для restore()."""
+        return super().get_queryset().filter(is_deleted=True)
@@ -0,0 +1,257 @@
+"""Метрики запросов: SQL, сериализация, рендеринг, Server-Timing и /metrics.
+
+PerformanceMiddleware ставится первой в MIDDLEWARE. На запрос она заводит
+RequestTimings в contextvar; SQL считает execute_wrapper, который ставится на
+каждое соединение при подключении, остальные участки отмечаются через timed().
+Contextvar копируется в sync_to_async, поэтому под ASGI учитывается и SQL из
+потоков. Гистограммы копятся в памяти процесса — при нескольких воркерах
+Prometheus опрашивает каждый отдельно.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework import serializers
+
+
+# Границы корзин гистограммы, секунды
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.sql_count = 0
+        self.durations = {'db': 0.0}
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: вызывается на каждый SQL-запрос
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations['db'] += time.perf_counter() - started
+            self.sql_count += 1
+
+
+def record_sql(execute, sql, params, many, context):
+    """execute_wrapper соединения: время SQL идёт в RequestTimings текущего запроса."""
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings(execute, sql, params, many, context)
+
+
+def install_sql_timing(sender, connection, **kwargs):
+    # connection_created: соединения потоковые, и под ASGI SQL выполняется не в том
+    # потоке, где работает middleware, поэтому обёртка ставится на каждое соединение
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+@contextmanager
+def timed(name):
+    """Добавляет время блока к участку name текущего запроса (вне запроса — ничего)."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class RouteMetrics:
+    """Латентность, число и время SQL по (метод, маршрут, код ответа)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._sql_queries = {}
+        self._sql_seconds = {}
+
+    def observe(self, labels, seconds, timings):
+        with self._lock:
+            histogram = self._latency.get(labels)
+            if histogram is None:
+                histogram = self._latency[labels] = Histogram()
+            histogram.observe(seconds)
+            self._sql_queries[labels] = self._sql_queries.get(labels, 0) + timings.sql_count
+            self._sql_seconds[labels] = self._sql_seconds.get(labels, 0.0) + timings.durations['db']
+
+    def render(self):
+        """Текстовый формат Prometheus."""
+        with self._lock:
+            latency = {labels: (list(h.buckets), h.count, h.sum) for labels, h in self._latency.items()}
+            sql_queries = dict(self._sql_queries)
+            sql_seconds = dict(self._sql_seconds)
+
+        lines = [
+            '# HELP http_request_duration_seconds Request latency by route.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for labels, (buckets, count, total) in sorted(latency.items()):
+            base = format_labels(labels)
+            cumulative = 0
+            for bound, value in zip(BUCKETS, buckets):
+                cumulative += value
+                lines.append(f'http_request_duration_seconds_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{base},le="+Inf"}} {count}')
+            lines.append(f'http_request_duration_seconds_sum{{{base}}} {total:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{base}}} {count}')
+
+        lines += ['# HELP http_request_sql_queries_total SQL queries by route.',
+                  '# TYPE http_request_sql_queries_total counter']
+        lines += [f'http_request_sql_queries_total{{{format_labels(labels)}}} {value}'
+                  for labels, value in sorted(sql_queries.items())]
+        lines += ['# HELP http_request_sql_seconds_total Time spent in SQL by route.',
+                  '# TYPE http_request_sql_seconds_total counter']
+        lines += [f'http_request_sql_seconds_total{{{format_labels(labels)}}} {value:.6f}'
+                  for labels, value in sorted(sql_seconds.items())]
+
+        # cache.py сам отмечает время рендеринга через timed(), импорт здесь разрывает цикл
+        from task_hw8.cache import counters as cache_counters
+        cache = cache_counters.snapshot()
+        lines += ['# HELP response_cache_requests_total Response cache lookups.',
+                  '# TYPE response_cache_requests_total counter',
+                  f'response_cache_requests_total{{result="hit"}} {cache.get("hits", 0)}',
+                  f'response_cache_requests_total{{result="miss"}} {cache.get("misses", 0)}']
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._sql_queries.clear()
+            self._sql_seconds.clear()
+
+
+def format_labels(labels):
+    method, route, status = labels
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'method="{method}",route="{route}",status="{status}"'
+
+
+route_metrics = RouteMetrics()
+
+
+def route_label(request):
+    # Шаблон маршрута, а не путь: /tasks/<int:pk>/ вместо тысяч /tasks/17/
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match is not None else 'unmatched'
+
+
+def server_timing(timings, total):
+    parts = [f'db;dur={timings.durations["db"] * 1000:.1f};desc="{timings.sql_count} queries"']
+    parts += [f'{name};dur={seconds * 1000:.1f}'
+              for name, seconds in timings.durations.items() if name != 'db']
+    parts.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(parts)
+
+
+class PerformanceMiddleware:
+    """Время запроса и его составляющие: Server-Timing в ответе и гистограммы для /metrics.
+
+    Работает и в sync-, и в async-цепочке. Время StreamingHttpResponse считается
+    до отдачи первого байта.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'SERVER_TIMING_HEADER', False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.finish(request, response, timings, started)
+
+    def finish(self, request, response, timings, started):
+        total = time.perf_counter() - started
+        route_metrics.observe((request.method, route_label(request), response.status_code), total, timings)
+        if self.server_timing:
+            response['Server-Timing'] = server_timing(timings, total)
+        return response
+
+    def process_template_response(self, request, response):
+        # Вызывается прямо перед render() ответа DRF, конец отмечает post-render callback
+        timings = _timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda r: timings.add('render', time.perf_counter() - started))
+        return response
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """Время serializer.data в Server-Timing (участок serialize).
+
+    Вложенные сериализаторы .data не вызывают, поэтому время не удваивается.
+    SQL ленивых связей, выполненный при сериализации, входит и сюда, и в db.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        meta = getattr(cls, 'Meta', None)
+        if meta is not None and not hasattr(meta, 'list_serializer_class'):
+            meta.list_serializer_class = TimedListSerializer
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+def metrics(request):
+    """Метрики процесса в формате Prometheus; доступ — с METRICS_ALLOWED_IPS."""
+    if request.META.get('REMOTE_ADDR') not in getattr(settings, 'METRICS_ALLOWED_IPS', ()):
+        return HttpResponseForbidden()
+    return HttpResponse(route_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
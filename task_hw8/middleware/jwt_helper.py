@@ -1,38 +1,45 @@
 from django.utils.deprecation import MiddlewareMixin
-from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 import datetime
 
+from task_hw8.authentication import token_cache
+from task_hw8.blacklist import CachedBlacklistRefreshToken
+from task_hw8.metrics import timed
+
+
 class JWTAuthenticationMiddleware(MiddlewareMixin):
     def process_request(self, request):
+        with timed('auth'):
+            self.authenticate_from_cookies(request)
+
+    def authenticate_from_cookies(self, request):
         access_token = request.COOKIES.get('access_token')
         refresh_token = request.COOKIES.get('refresh_token')
 
         if access_token:
             try:
-                token = AccessToken(access_token)
-                if datetime.datetime.fromtimestamp(token['exp'], datetime.timezone.utc) < datetime.datetime.now(datetime.timezone.utc):
-                    raise TokenError('Token expired')
+                # Кеш сам отклоняет истёкшие токены, подпись проверяется один раз на процесс
+                token = token_cache.get(access_token)
                 request.META['HTTP_AUTHORIZATION'] = f'Bearer {access_token}'
+                request.jwt_claims = token.payload
             except TokenError:
-                new_access = self.refresh_access_token(refresh_token)
-                if new_access:
-                    request.META['HTTP_AUTHORIZATION'] = f'Bearer {new_access}'
-                    request._new_access_token = new_access
-                else:
-                    self.clear_cookies(request)
+                self.use_refreshed_token(request, refresh_token)
         elif refresh_token:
-            new_access = self.refresh_access_token(refresh_token)
-            if new_access:
-                request.META['HTTP_AUTHORIZATION'] = f'Bearer {new_access}'
-                request._new_access_token = new_access
-            else:
-                self.clear_cookies(request)
+            self.use_refreshed_token(request, refresh_token)
+
+    def use_refreshed_token(self, request, refresh_token):
+        new_access = self.refresh_access_token(refresh_token)
+        if new_access:
+            request.META['HTTP_AUTHORIZATION'] = f'Bearer {new_access}'
+            request._new_access_token = new_access
+            request.jwt_claims = token_cache.get(new_access).payload
+        else:
+            self.clear_cookies(request)
 
     def process_response(self, request, response):
         new_access = getattr(request, '_new_access_token', None)
         if new_access:
-            access_exp = AccessToken(new_access)['exp']
+            access_exp = token_cache.get(new_access)['exp']
             response.set_cookie(
                 key='access_token',
                 value=new_access,
@@ -44,11 +51,17 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
         return response
 
     def refresh_access_token(self, refresh_token):
+        if not refresh_token:
+            return None
         try:
-            refresh = RefreshToken(refresh_token)
-            return str(refresh.access_token)
+            refresh = CachedBlacklistRefreshToken(refresh_token)
+            access = refresh.access_token
         except TokenError:
             return None
+        raw_access = str(access)
+        # Только что выпущенный токен не нужно проверять повторно
+        token_cache.add(raw_access, access)
+        return raw_access
 
     def clear_cookies(self, request):
 
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-18 12:51
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_deadline_weekday(apps, schema_editor):
+    Task = apps.get_model('task_hw8', 'Task')
+    batch = []
+    for task in Task.objects.only('id', 'deadline').iterator(chunk_size=2000):
+        deadline = task.deadline
+        if timezone.is_aware(deadline):
+            deadline = timezone.localtime(deadline)
+        task.deadline_weekday = deadline.weekday()
+        batch.append(task)
+        if len(batch) >= 2000:
+            Task.objects.bulk_update(batch, ['deadline_weekday'])
+            batch = []
+    if batch:
+        Task.objects.bulk_update(batch, ['deadline_weekday'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_hw8', '0007_taskstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='deadline_weekday',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_deadline_weekday, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'deadline_weekday', '-created_at'], name='task_owner_weekday_idx'),
+        ),
+    ]
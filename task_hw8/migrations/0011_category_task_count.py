@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 12:59
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_task_count(apps, schema_editor):
+    Task = apps.get_model('task_hw8', 'Task')
+    Category = apps.get_model('task_hw8', 'Category')
+    through = Task.categories.through
+    counts = through.objects.filter(category_id=OuterRef('pk')).order_by()\
+                    .values('category_id').annotate(count=Count('id')).values('count')
+    Category.objects.update(task_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_hw8', '0010_category_live_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_task_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+from django.db import migrations
+
+
+# SQL записан буквально: миграция не должна меняться вместе с task_hw8/search.py.
+# FTS5-таблицы с внешним содержимым и триггеры, которые держат их в синхронизации
+SQLITE_FTS_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_hw8_task_fts USING fts5(title, description, content='task_hw8_task', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_ai',
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_ad',
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_au',
+    'CREATE TRIGGER task_hw8_task_fts_ai AFTER INSERT ON task_hw8_task BEGIN INSERT INTO task_hw8_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    "CREATE TRIGGER task_hw8_task_fts_ad AFTER DELETE ON task_hw8_task BEGIN INSERT INTO task_hw8_task_fts(task_hw8_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER task_hw8_task_fts_au AFTER UPDATE OF title, description ON task_hw8_task BEGIN INSERT INTO task_hw8_task_fts(task_hw8_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); INSERT INTO task_hw8_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO task_hw8_task_fts(task_hw8_task_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_hw8_subtask_fts USING fts5(title, description, content='task_hw8_subtask', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_ai',
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_ad',
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_au',
+    'CREATE TRIGGER task_hw8_subtask_fts_ai AFTER INSERT ON task_hw8_subtask BEGIN INSERT INTO task_hw8_subtask_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    "CREATE TRIGGER task_hw8_subtask_fts_ad AFTER DELETE ON task_hw8_subtask BEGIN INSERT INTO task_hw8_subtask_fts(task_hw8_subtask_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER task_hw8_subtask_fts_au AFTER UPDATE OF title, description ON task_hw8_subtask BEGIN INSERT INTO task_hw8_subtask_fts(task_hw8_subtask_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); INSERT INTO task_hw8_subtask_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO task_hw8_subtask_fts(task_hw8_subtask_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL_SQL = [
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_ai',
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_ad',
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_au',
+    'DROP TABLE IF EXISTS task_hw8_task_fts',
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_ai',
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_ad',
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_au',
+    'DROP TABLE IF EXISTS task_hw8_subtask_fts',
+]
+
+# Таблица -> (имя индекса, колонки) для MySQL
+MYSQL_FULLTEXT_INDEXES = {
+    'task_hw8_task': ('task_hw8_task_fts', 'title, description'),
+    'task_hw8_subtask': ('task_hw8_subtask_fts', 'title, description'),
+}
+
+
+def install(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for sql in SQLITE_FTS_SQL:
+                cursor.execute(sql)
+        elif connection.vendor == 'mysql':
+            for table, (index, columns) in MYSQL_FULLTEXT_INDEXES.items():
+                if index not in connection.introspection.get_constraints(cursor, table):
+                    cursor.execute(f'ALTER TABLE {table} ADD FULLTEXT INDEX {index} ({columns})')
+
+
+def uninstall(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for sql in SQLITE_UNINSTALL_SQL:
+                cursor.execute(sql)
+        elif connection.vendor == 'mysql':
+            for table, (index, _) in MYSQL_FULLTEXT_INDEXES.items():
+                if index in connection.introspection.get_constraints(cursor, table):
+                    cursor.execute(f'ALTER TABLE {table} DROP INDEX {index}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_hw8', '0011_category_task_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2 on 2026-10-18 13:14
+
+import task_hw8.fields
+from django.db import migrations
+
+
+# Значения на момент миграции; дальше Status может меняться
+STATUS_CODES = {
+    'New': 1,
+    'In progress': 2,
+    'Pending': 3,
+    'Blocked': 4,
+    'Done': 5,
+    'Archived': 6,
+}
+
+
+# Копия SQL из 0012_fulltext_search: миграция не должна зависеть от task_hw8/search.py
+SQLITE_FTS_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_hw8_task_fts USING fts5(title, description, content='task_hw8_task', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_ai',
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_ad',
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_au',
+    'CREATE TRIGGER task_hw8_task_fts_ai AFTER INSERT ON task_hw8_task BEGIN INSERT INTO task_hw8_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    "CREATE TRIGGER task_hw8_task_fts_ad AFTER DELETE ON task_hw8_task BEGIN INSERT INTO task_hw8_task_fts(task_hw8_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER task_hw8_task_fts_au AFTER UPDATE OF title, description ON task_hw8_task BEGIN INSERT INTO task_hw8_task_fts(task_hw8_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); INSERT INTO task_hw8_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO task_hw8_task_fts(task_hw8_task_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_hw8_subtask_fts USING fts5(title, description, content='task_hw8_subtask', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_ai',
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_ad',
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_au',
+    'CREATE TRIGGER task_hw8_subtask_fts_ai AFTER INSERT ON task_hw8_subtask BEGIN INSERT INTO task_hw8_subtask_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    "CREATE TRIGGER task_hw8_subtask_fts_ad AFTER DELETE ON task_hw8_subtask BEGIN INSERT INTO task_hw8_subtask_fts(task_hw8_subtask_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER task_hw8_subtask_fts_au AFTER UPDATE OF title, description ON task_hw8_subtask BEGIN INSERT INTO task_hw8_subtask_fts(task_hw8_subtask_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); INSERT INTO task_hw8_subtask_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO task_hw8_subtask_fts(task_hw8_subtask_fts) VALUES ('rebuild')",
+]
+
+
+def labels_to_codes(apps, schema_editor):
+    # Колонка ещё строковая: пишем '1'..'6', AlterField приведёт их к числу
+    for model_name in ('Task', 'SubTask'):
+        model = apps.get_model('task_hw8', model_name)
+        for label, code in STATUS_CODES.items():
+            model.objects.filter(status__iexact=label).update(status=str(code))
+
+
+def codes_to_labels(apps, schema_editor):
+    for model_name in ('Task', 'SubTask'):
+        model = apps.get_model('task_hw8', model_name)
+        for label, code in STATUS_CODES.items():
+            model.objects.filter(status=str(code)).update(status=label)
+
+
+def reinstall_fts(apps, schema_editor):
+    # На SQLite AlterField пересоздаёт таблицы, триггеры FTS нужно вернуть;
+    # индексы MySQL при этом сохраняются
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in SQLITE_FTS_SQL:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_hw8', '0012_fulltext_search'),
+    ]
+
+    operations = [
+        # При откате таблицы пересоздаются ещё раз, поэтому FTS восстанавливаем и в конце отката
+        migrations.RunPython(migrations.RunPython.noop, reinstall_fts),
+        migrations.RunPython(labels_to_codes, codes_to_labels),
+        migrations.AlterField(
+            model_name='subtask',
+            name='status',
+            field=task_hw8.fields.LabeledIntegerField(choices=[(1, 'New'), (2, 'In progress'), (3, 'Pending'), (4, 'Blocked'), (5, 'Done'), (6, 'Archived')]),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=task_hw8.fields.LabeledIntegerField(choices=[(1, 'New'), (2, 'In progress'), (3, 'Pending'), (4, 'Blocked'), (5, 'Done'), (6, 'Archived')], default=1),
+        ),
+        migrations.RunPython(reinstall_fts, reinstall_fts),
+    ]
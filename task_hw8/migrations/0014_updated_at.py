@@ -0,0 +1,78 @@
+# Generated by Django 5.2 on 2026-10-18 13:18
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+# Копия SQL из 0012_fulltext_search: миграция не должна зависеть от task_hw8/search.py
+SQLITE_FTS_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_hw8_task_fts USING fts5(title, description, content='task_hw8_task', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_ai',
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_ad',
+    'DROP TRIGGER IF EXISTS task_hw8_task_fts_au',
+    'CREATE TRIGGER task_hw8_task_fts_ai AFTER INSERT ON task_hw8_task BEGIN INSERT INTO task_hw8_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    "CREATE TRIGGER task_hw8_task_fts_ad AFTER DELETE ON task_hw8_task BEGIN INSERT INTO task_hw8_task_fts(task_hw8_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER task_hw8_task_fts_au AFTER UPDATE OF title, description ON task_hw8_task BEGIN INSERT INTO task_hw8_task_fts(task_hw8_task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); INSERT INTO task_hw8_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO task_hw8_task_fts(task_hw8_task_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_hw8_subtask_fts USING fts5(title, description, content='task_hw8_subtask', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_ai',
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_ad',
+    'DROP TRIGGER IF EXISTS task_hw8_subtask_fts_au',
+    'CREATE TRIGGER task_hw8_subtask_fts_ai AFTER INSERT ON task_hw8_subtask BEGIN INSERT INTO task_hw8_subtask_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    "CREATE TRIGGER task_hw8_subtask_fts_ad AFTER DELETE ON task_hw8_subtask BEGIN INSERT INTO task_hw8_subtask_fts(task_hw8_subtask_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER task_hw8_subtask_fts_au AFTER UPDATE OF title, description ON task_hw8_subtask BEGIN INSERT INTO task_hw8_subtask_fts(task_hw8_subtask_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); INSERT INTO task_hw8_subtask_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO task_hw8_subtask_fts(task_hw8_subtask_fts) VALUES ('rebuild')",
+]
+
+
+def copy_created_at(apps, schema_editor):
+    # Для старых строк точнее «не менялись с создания», чем время миграции
+    for model_name in ('Task', 'SubTask'):
+        apps.get_model('task_hw8', model_name).objects.update(updated_at=F('created_at'))
+
+
+def reinstall_fts(apps, schema_editor):
+    # На SQLite AddField пересоздаёт таблицы, триггеры FTS нужно вернуть;
+    # индексы MySQL при этом сохраняются
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in SQLITE_FTS_SQL:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_hw8', '0013_status_integer'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_fts),
+        migrations.AddField(
+            model_name='subtask',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_fts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['owner', 'updated_at'], name='subtask_owner_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['task', 'updated_at'], name='subtask_task_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'updated_at'], name='task_owner_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2 on 2026-10-18 14:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_hw8', '0014_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='subtask',
+            options={'ordering': ('-created_at', '-id'), 'verbose_name': 'SubTask'},
+        ),
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ('-created_at', '-id'), 'verbose_name': 'Task'},
+        ),
+        migrations.RemoveIndex(
+            model_name='subtask',
+            name='subtask_owner_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='subtask',
+            name='subtask_owner_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='subtask',
+            name='subtask_owner_deadline_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_owner_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_owner_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_owner_deadline_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_owner_weekday_idx',
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='subtask_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['owner', 'status', '-created_at', '-id'], name='subtask_owner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['owner', 'deadline', '-created_at', '-id'], name='subtask_owner_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='task_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'status', '-created_at', '-id'], name='task_owner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'deadline', '-created_at', '-id'], name='task_owner_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'deadline_weekday', '-created_at', '-id'], name='task_owner_weekday_idx'),
+        ),
+    ]
@@ -1,22 +1,39 @@
 from django.db import models
 from django.utils import timezone
-from .managers import SoftDeleteManager
+from .fields import LabeledIntegerField, parse_choice
+from .managers import SoftDeleteManager, soft_delete_changed
+from .tracking import FieldTrackingMixin
 
 from django.conf import settings
 
 
-class Category(models.Model):
+class Category(FieldTrackingMixin, models.Model):
     name = models.CharField(max_length=100)
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
+    # Денормализованное число задач; поддерживается сигналами, сверяется reconcile_category_counts
+    task_count = models.PositiveIntegerField(default=0, editable=False)
 
     objects = SoftDeleteManager()
+    # Все строки, включая удалённые. Обычный менеджер: delete() через него удаляет
+    # по-настоящему; восстановление — Category.objects.deleted().restore()
     all_objects = models.Manager()
 
     def delete(self, using=None, keep_parents=False):
         self.is_deleted = True
         self.deleted_at = timezone.now()
-        self.save()
+        Category.all_objects.filter(pk=self.pk).update(is_deleted=True, deleted_at=self.deleted_at)
+        self.snapshot_original_values(['is_deleted', 'deleted_at'])
+        soft_delete_changed.send(sender=Category, pks=[self.pk])
+
+    def hard_delete(self, using=None, keep_parents=False):
+        return super().delete(using=using, keep_parents=keep_parents)
+
+    def restore(self):
+        self.is_deleted = False
+        self.deleted_at = None
+        Category.objects.deleted().filter(pk=self.pk).restore()
+        self.snapshot_original_values(['is_deleted', 'deleted_at'])
 
     def __str__(self):
         return self.name
@@ -25,24 +42,49 @@ class Category(models.Model):
             verbose_name = "Category"
             db_table = "task_hw8_category"
             unique_together = ("name",)
+            indexes = [
+                # Частичный индекс только по живым строкам: размер не растёт с удалёнными
+                models.Index(fields=["name"], condition=models.Q(is_deleted=False), name="category_live_name_idx"),
+            ]
+
+def deadline_weekday(deadline):
+    """День недели в текущей таймзоне, как его видит пользователь (0 — понедельник)."""
+    if timezone.is_aware(deadline):
+        deadline = timezone.localtime(deadline)
+    return deadline.weekday()
+
+
+class Status(models.IntegerChoices):
+    # В БД хранится число, в API — метка
+    NEW = 1, "New"
+    IN_PROGRESS = 2, "In progress"
+    PENDING = 3, "Pending"
+    BLOCKED = 4, "Blocked"
+    DONE = 5, "Done"
+    ARCHIVED = 6, "Archived"
+
+
+status_choices = Status.choices
+
 
-status_choices = [
-    ("New", "New"),
-    ("In progress", "In progress"),
-    ("Pending", "Pending"),
-    ("Blocked", "Blocked"),
-    ("Done", "Done"),
-    ("Archived", "Archived"),]
+def parse_status(value):
+    """Status по числу или метке без учёта регистра; None, если статус неизвестен."""
+    status = parse_choice(status_choices, value)
+    return None if status is None else Status(status)
 
 
 
-class Task(models.Model):
+class Task(FieldTrackingMixin, models.Model):
     title = models.CharField(max_length=100, unique_for_date='deadline')
     description = models.TextField(null=True, blank=True)
     categories = models.ManyToManyField(Category)
-    status = models.CharField(max_length=40, choices=status_choices, default="New")
+    status = LabeledIntegerField(choices=status_choices, default=Status.NEW)
     deadline = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # update() и bulk_update() должны проставлять его сами
+    updated_at = models.DateTimeField(auto_now=True)
+    # День недели дедлайна (0 — понедельник), хранится ради индексируемого фильтра
+    deadline_weekday = models.PositiveSmallIntegerField(editable=False, default=0)
     owner = models.ForeignKey(
        settings.AUTH_USER_MODEL,
        on_delete = models.CASCADE,
@@ -53,19 +95,44 @@ class Task(models.Model):
     class Meta:
         verbose_name = "Task"
         db_table = "task_hw8_task"
-        ordering = ("-created_at",)
+        ordering = ("-created_at", "-id")
         unique_together = ("title",)
+        indexes = [
+            models.Index(fields=["owner", "-created_at", "-id"], name="task_owner_created_idx"),
+            models.Index(fields=["owner", "status", "-created_at", "-id"], name="task_owner_status_idx"),
+            models.Index(fields=["owner", "deadline", "-created_at", "-id"], name="task_owner_deadline_idx"),
+            models.Index(fields=["owner", "deadline_weekday", "-created_at", "-id"], name="task_owner_weekday_idx"),
+            models.Index(fields=["owner", "updated_at"], name="task_owner_updated_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
-class SubTask(models.Model):
+    derived_fields = ('deadline_weekday',)
+
+    def sync_derived_fields(self):
+        """Вычисляемые колонки; bulk_create/bulk_update должны вызывать это сами."""
+        self.deadline_weekday = deadline_weekday(self.deadline)
+
+    def save(self, *args, **kwargs):
+        self.sync_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # auto_now пишется, только если поле есть в update_fields
+            update_fields = {*update_fields, 'updated_at'}
+            if 'deadline' in update_fields:
+                update_fields.update(self.derived_fields)
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+class SubTask(FieldTrackingMixin, models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField(null=True, blank=True)
     task = models.ForeignKey(Task, on_delete=models.CASCADE)
-    status = models.CharField(max_length=40, choices=status_choices)
+    status = LabeledIntegerField(choices=status_choices)
     deadline = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete = models.CASCADE,
@@ -76,8 +143,69 @@ class SubTask(models.Model):
     class Meta:
         verbose_name = "SubTask"
         db_table = "task_hw8_subtask"
-        ordering = ("-created_at",)
+        ordering = ("-created_at", "-id")
         unique_together = ("title",)
+        indexes = [
+            models.Index(fields=["owner", "-created_at", "-id"], name="subtask_owner_created_idx"),
+            models.Index(fields=["owner", "status", "-created_at", "-id"], name="subtask_owner_status_idx"),
+            models.Index(fields=["owner", "deadline", "-created_at", "-id"], name="subtask_owner_deadline_idx"),
+            models.Index(fields=["owner", "updated_at"], name="subtask_owner_updated_idx"),
+            models.Index(fields=["task", "updated_at"], name="subtask_task_updated_idx"),
+        ]
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+        super().save(*args, **kwargs)
+
+
+class TaskStats(models.Model):
+    owner = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='task_stats'
+    )
+    total = models.PositiveIntegerField(default=0)
+    new = models.PositiveIntegerField(default=0)
+    in_progress = models.PositiveIntegerField(default=0)
+    pending = models.PositiveIntegerField(default=0)
+    blocked = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+    archived = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Task stats"
+        db_table = "task_hw8_taskstats"
+
+    def __str__(self):
+        return f"{self.owner_id}: {self.total}"
+
+
+class NotificationOutbox(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    task = models.ForeignKey(Task, on_delete=models.SET_NULL, null=True, blank=True)
+    task_title = models.CharField(max_length=100)
+    old_status = models.CharField(max_length=40)
+    new_status = models.CharField(max_length=40)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Notification outbox"
+        db_table = "task_hw8_notification_outbox"
+        ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["sent_at", "created_at"], name="outbox_pending_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task_title}: {self.old_status} -> {self.new_status}"
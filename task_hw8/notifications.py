@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from task_hw8.models import NotificationOutbox, Status
+
+
+def outbox_row(task, previous_status):
+    # В outbox — метки статусов: письма собираются из них без обращения к Status
+    return NotificationOutbox(
+        user_id=task.owner_id,
+        task=task,
+        task_title=task.title,
+        old_status=Status(previous_status).label,
+        new_status=Status(task.status).label,
+    )
+
+
+def enqueue_status_change(task, previous_status):
+    """На пути запроса — только INSERT в outbox, письмо отправит send_notifications."""
+    if task.owner_id is None:
+        return
+    outbox_row(task, previous_status).save()
+
+
+def enqueue_status_changes(changes):
+    """Пакетный вариант для bulk-операций: changes — пары (задача, прежний статус)."""
+    rows = [outbox_row(task, previous) for task, previous in changes if task.owner_id is not None]
+    if rows:
+        NotificationOutbox.objects.bulk_create(rows)
+
+
+def build_message(user, rows):
+    """Одно письмо на пользователя: одиночное изменение или сводка по нескольким задачам.
+
+    Несколько изменений одной задачи схлопываются в «первый статус -> последний».
+    """
+    changes = OrderedDict()
+    for row in rows:
+        key = row.task_id or row.task_title
+        first_status = changes[key][1] if key in changes else row.old_status
+        changes[key] = (row.task_title, first_status, row.new_status)
+    changes = [change for change in changes.values() if change[1] != change[2]]
+    if not changes or not user.email:
+        return None
+
+    if len(changes) == 1:
+        title, old_status, new_status = changes[0]
+        subject = f"Изменение статуса задачи: {title}"
+        message = (
+            f"Здравствуйте, {user.username}!\n\n"
+            f"Статус вашей задачи \"{title}\" изменён с "
+            f"\"{old_status}\" на \"{new_status}\".\n"
+        )
+    else:
+        subject = f"Изменение статуса задач: {len(changes)}"
+        lines = [f"- \"{title}\": \"{old_status}\" -> \"{new_status}\"" for title, old_status, new_status in changes]
+        message = (
+            f"Здравствуйте, {user.username}!\n\n"
+            f"Статусы ваших задач изменились:\n" + "\n".join(lines) + "\n"
+        )
+    return EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
+
+
+def drain_outbox(mail_connection, batch_size=500, coalesce_seconds=60, max_delay_seconds=600):
+    """Отправляет одну пачку накопленных уведомлений, возвращает число обработанных строк.
+
+    Изменения пользователя ждут coalesce_seconds тишины, чтобы уйти одной сводкой,
+    но не дольше max_delay_seconds с момента первого изменения.
+    """
+    now = timezone.now()
+    quiet_since = now - timedelta(seconds=coalesce_seconds)
+    overdue_since = now - timedelta(seconds=max_delay_seconds)
+
+    with transaction.atomic():
+        pending = NotificationOutbox.objects.filter(sent_at__isnull=True).order_by('created_at')
+        if connection.features.has_select_for_update_skip_locked:
+            # Несколько воркеров не заберут одни и те же строки
+            pending = pending.select_for_update(skip_locked=True)
+        rows = list(pending[:batch_size])
+
+        by_user = OrderedDict()
+        for row in rows:
+            by_user.setdefault(row.user_id, []).append(row)
+
+        ready = {
+            user_id: user_rows for user_id, user_rows in by_user.items()
+            if user_rows[-1].created_at <= quiet_since or user_rows[0].created_at <= overdue_since
+        }
+        if not ready:
+            return 0
+
+        users = get_user_model().objects.in_bulk(list(ready))
+        messages = []
+        for user_id, user_rows in ready.items():
+            message = build_message(users[user_id], user_rows) if user_id in users else None
+            if message:
+                messages.append(message)
+
+        if messages:
+            mail_connection.send_messages(messages)
+        done = [row.pk for user_rows in ready.values() for row in user_rows]
+        NotificationOutbox.objects.filter(pk__in=done).update(sent_at=now)
+    return len(done)
@@ -0,0 +1,67 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def optimize_queryset(queryset, serializer, load_only=True, required=()):
+    """Добавляет select_related/prefetch_related/only() по объявленным полям сериализатора.
+
+    Прямые FK, которые выводятся через PrimaryKeyRelatedField, не джойнятся —
+    DRF берёт только значение <field>_id.
+    """
+    model = queryset.model
+    columns = {model._meta.pk.name, *required}
+    select, prefetch = [], []
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            model_field = None
+
+        if isinstance(field, serializers.ListSerializer):
+            child_model = field.child.Meta.model
+            remote_field = getattr(model, field.source).field
+            # FK на родителя нужен prefetch_related, чтобы разложить строки по объектам
+            child_queryset = optimize_queryset(
+                child_model._default_manager.all(), field.child, load_only, required=[remote_field.name]
+            )
+            prefetch.append(Prefetch(field.source, queryset=child_queryset))
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetch.append(field.source)
+        elif model_field is None:
+            # Свойство или метод модели — неизвестно, какие колонки ему нужны
+            load_only = False
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            columns.add(model_field.name)
+        elif isinstance(field, (serializers.RelatedField, serializers.BaseSerializer)):
+            select.append(field.source)
+            columns.add(model_field.name)
+        elif model_field.concrete:
+            columns.add(model_field.name)
+
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if load_only:
+        queryset = queryset.only(*columns)
+    return queryset
+
+
+class QuerySetOptimizerMixin:
+    """Миксин для generic-представлений: оптимизирует queryset под serializer_class.
+
+    Подключается через filter_queryset(), который вызывают и list(), и get_object(),
+    поэтому представления могут свободно переопределять get_queryset().
+    only() применяется только для безопасных методов, чтобы save() после
+    изменения объекта не пропускал отложенные колонки.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        load_only = self.request.method in SAFE_METHODS
+        return optimize_queryset(queryset, self.get_serializer(), load_only)
@@ -1,5 +1,6 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.pagination import CursorPagination
+from rest_framework.settings import api_settings
 
 class CustomCursorPagination(CursorPagination):
     page_size = 6
@@ -10,6 +11,69 @@ class SubTaskPagination(PageNumberPagination):
    ordering = '-created_at'
 
 
+class CreatedAtCursorPagination(CursorPagination):
+    page_size = api_settings.PAGE_SIZE
+    # Совпадает с индексами (owner, -created_at, -id): id делает порядок строк
+    # с одинаковым created_at однозначным, их DRF различает по смещению в курсоре
+    ordering = ('-created_at', '-id')
 
 
+class SelectablePagination(BasePagination):
+    """Постраничная пагинация по умолчанию, keyset (курсор) по запросу.
 
+    Курсорный режим включается параметром ?pagination=cursor или наличием
+    ?cursor=...; в нём нет ни COUNT(*), ни OFFSET, поэтому страница N стоит
+    столько же, сколько первая.
+    """
+    page_pagination_class = PageNumberPagination
+    cursor_pagination_class = CreatedAtCursorPagination
+    mode_query_param = 'pagination'
+
+    def __init__(self):
+        self.page_paginator = self.page_pagination_class()
+        self.cursor_paginator = self.cursor_pagination_class()
+        self.paginator = self.page_paginator
+
+    def use_cursor(self, request):
+        return (request.query_params.get(self.mode_query_param) == 'cursor'
+                or self.cursor_paginator.cursor_query_param in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.paginator = self.cursor_paginator
+        else:
+            self.paginator = self.page_paginator
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_paginator.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def get_schema_operation_parameters(self, view):
+        return (self.page_paginator.get_schema_operation_parameters(view)
+                + self.cursor_paginator.get_schema_operation_parameters(view))
+
+
+class TaskListPagination(SelectablePagination):
+    pass
+
+
+class SubTaskCursorPagination(CreatedAtCursorPagination):
+    page_size = SubTaskPagination.page_size
+
+
+class SubTaskListPagination(SelectablePagination):
+    page_pagination_class = SubTaskPagination
+    cursor_pagination_class = SubTaskCursorPagination
@@ -0,0 +1,170 @@
+"""Чтение с реплик для безопасных запросов, запись — всегда в default.
+
+Реплики задаются в settings.DATABASE_REPLICAS. Запрос попадает на реплику, только если
+ReplicaRoutingMiddleware разрешила это для текущего запроса (GET/HEAD/OPTIONS) и
+клиент недавно ничего не менял: после записи его чтения REPLICA_STICKY_SECONDS идут
+в default, чтобы он сразу видел свои изменения несмотря на задержку репликации.
+"""
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from task_hw8.authentication import token_cache
+from task_hw8.cache import get_cache
+
+
+PIN_COOKIE = 'db_pinned'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Разрешено ли текущему запросу (или блоку кода) читать с реплики
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+
+
+@contextmanager
+def route_reads(replica):
+    """Явно включает (True) или запрещает (False) чтение с реплик внутри блока."""
+    token = _replica_reads.set(replica)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def use_primary():
+    return route_reads(False)
+
+
+def use_replica():
+    return route_reads(True)
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or not _replica_reads.get():
+            return DEFAULT_DB_ALIAS
+        # Внутри транзакции на default реплика не увидит её незакоммиченных изменений
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default, объекты с любой из них можно связывать
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема на реплики приходит репликацией (или sync_replicas для SQLite)
+        return db not in replica_aliases()
+
+
+def client_identity(request):
+    """Ключ клиента для закрепления за default: пользователь из JWT или сессия."""
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    raw_token = header[7:] if header.startswith('Bearer ') else request.COOKIES.get('access_token')
+    if raw_token:
+        try:
+            return f'user:{token_cache.get(raw_token)[api_settings.USER_ID_CLAIM]}'
+        except (TokenError, KeyError):
+            pass
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        return 'session:' + hashlib.md5(session_key.encode(), usedforsecurity=False).hexdigest()
+    return None
+
+
+def pin_key(identity):
+    return f'db:pinned:{identity}'
+
+
+def is_pinned(request, identity):
+    if request.COOKIES.get(PIN_COOKIE):
+        return True
+    return identity is not None and get_cache().get(pin_key(identity)) is not None
+
+
+async def ais_pinned(request, identity):
+    if request.COOKIES.get(PIN_COOKIE):
+        return True
+    return identity is not None and await get_cache().aget(pin_key(identity)) is not None
+
+
+class ReplicaRoutingMiddleware:
+    """Включает чтение с реплик для безопасных запросов и закрепляет клиента после записи.
+
+    Закрепление хранится и в cookie (браузер, тот же процесс не нужен), и в кеше по
+    пользователю — для API-клиентов без cookie. Для нескольких процессов кеш должен
+    быть общим (CACHE_URL=redis://...). Под ASGI работает без перехода в поток:
+    contextvar route_reads копируется в sync_to_async вместе с контекстом.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+
+        identity = client_identity(request)
+        replica = request.method in SAFE_METHODS and not is_pinned(request, identity)
+        with route_reads(replica):
+            response = self.get_response(request)
+
+        pin = self.pin(request, response, identity)
+        if pin is not None:
+            get_cache().set(*pin)
+        return response
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+
+        identity = client_identity(request)
+        replica = request.method in SAFE_METHODS and not await ais_pinned(request, identity)
+        with route_reads(replica):
+            response = await self.get_response(request)
+
+        pin = self.pin(request, response, identity)
+        if pin is not None:
+            await get_cache().aset(*pin)
+        return response
+
+    def pin(self, request, response, identity):
+        """Ставит cookie после успешной записи; возвращает (ключ, значение, время) для кеша или None."""
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return None
+        seconds = sticky_seconds()
+        response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+        # После логина пользователь известен только по ответу
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            identity = f'user:{user.pk}'
+        if identity is None:
+            return None
+        return pin_key(identity), 1, seconds
@@ -0,0 +1,78 @@
+import re
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+
+# Таблица -> колонки, по которым строится полнотекстовый индекс. Сами индексы
+# создаёт миграция 0012_fulltext_search; миграция, которая на SQLite пересоздаёт
+# эти таблицы, должна вернуть триггеры FTS (см. 0013_status_integer)
+FTS_TABLES = {
+    'task_hw8_task': ('title', 'description'),
+    'task_hw8_subtask': ('title', 'description'),
+}
+
+
+def fts_name(table):
+    return f'{table}_fts'
+
+
+_fts_available = {}
+
+
+def fts_available(alias, table):
+    if (alias, table) not in _fts_available:
+        connection = connections[alias]
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                available = fts_name(table) in connection.introspection.table_names(cursor)
+        else:
+            available = connection.vendor == 'mysql' and table in FTS_TABLES
+        _fts_available[alias, table] = available
+    return _fts_available[alias, table]
+
+
+class FullTextSearchFilter(SearchFilter):
+    """?search=... через полнотекстовый индекс вместо LIKE '%...%'.
+
+    Каждое слово запроса ищется как префикс, все слова обязательны. Результаты
+    отсортированы по релевантности, если не передан ?ordering; поэтому фильтр
+    ставится после OrderingFilter. Там, где индекса нет, работает обычный SearchFilter.
+    """
+    ordering_param = 'ordering'
+
+    def get_words(self, request):
+        return re.findall(r'\w+', ' '.join(self.get_search_terms(request)))
+
+    def filter_queryset(self, request, queryset, view):
+        table = queryset.model._meta.db_table
+        if not self.get_search_terms(request) or not fts_available(queryset.db, table):
+            return super().filter_queryset(request, queryset, view)
+
+        words = self.get_words(request)
+        if not words:
+            return queryset.none()
+
+        fts = fts_name(table)
+        if connections[queryset.db].vendor == 'sqlite':
+            match = ' '.join('"%s"*' % word for word in words)
+            # Соединение с FTS-таблицей: MATCH выполняется один раз на запрос,
+            # rank (bm25, меньше — лучше) берётся из той же строки. "+ 0" не даёт
+            # планировщику перебирать задачи и делать MATCH по rowid для каждой
+            queryset = queryset.extra(
+                tables=[fts],
+                where=[f'{fts}.rowid + 0 = {table}.id', f'{fts} MATCH %s'],
+                params=[match],
+                select={'search_rank': f'-{fts}.rank'},
+            )
+        else:
+            match = ' '.join('+%s*' % word for word in words)
+            columns = ', '.join(FTS_TABLES[table])
+            queryset = queryset.annotate(
+                search_rank=RawSQL(f'MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)', [match])
+            ).filter(search_rank__gt=0)
+
+        if self.ordering_param not in request.query_params:
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        return queryset
@@ -1,9 +1,36 @@
 from rest_framework import serializers
 from django.utils import timezone
-from task_hw8.models import Task,SubTask,Category
+from task_hw8.models import Task,SubTask,Category,Status,parse_status
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt.serializers import TokenBlacklistSerializer, TokenRefreshSerializer
+from task_hw8.blacklist import CachedBlacklistRefreshToken
+from task_hw8.metrics import TimedSerializerMixin
+
+
+class StatusLabelField(serializers.ChoiceField):
+    """Статус в API — метка ("In progress"), в модели — число из Status."""
+
+    def __init__(self, **kwargs):
+        super().__init__(choices=[(label, label) for label in Status.labels], **kwargs)
+
+    def to_internal_value(self, data):
+        status = parse_status(data)
+        if status is None:
+            self.fail('invalid_choice', input=data)
+        return status
+
+    def to_representation(self, value):
+        return Status(value).label
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CachedBlacklistRefreshToken
+
+
+class CachedTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = CachedBlacklistRefreshToken
 
 
 class RegisterUserSerializer(serializers.ModelSerializer):
@@ -38,20 +65,24 @@ class RegisterUserSerializer(serializers.ModelSerializer):
 
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    status = StatusLabelField(required=False)
+
     class Meta:
         model = Task
         fields = ['id', 'title', 'description', 'status', 'deadline']
 
 
 
-class SubTaskCreateSerializer(serializers.ModelSerializer):
+class SubTaskCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    status = StatusLabelField()
+
     class Meta:
         model = SubTask
         fields = '__all__'
@@ -61,7 +92,9 @@ class SubTaskCreateSerializer(serializers.ModelSerializer):
         def create(self, validated_data):
             return SubTask.objects.create(owner=self.context['request'].user, **validated_data)
 
-class SubTaskSerializer(serializers.ModelSerializer):
+class SubTaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    status = StatusLabelField()
+
     class Meta:
         model = SubTask
         fields = ['id', 'title', 'description', 'status', 'deadline', 'created_at']
@@ -74,7 +107,7 @@ def validate_name(value):
     return value
 
 
-class CategoryCreateSerializer(serializers.ModelSerializer):
+class CategoryCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name']
@@ -89,9 +122,10 @@ class CategoryCreateSerializer(serializers.ModelSerializer):
 
 
 
-class TaskDetailSerializer(serializers.ModelSerializer):
+class TaskDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     subtasks = SubTaskSerializer(source='subtask_set', many=True, read_only=True)
     owner = serializers.StringRelatedField(read_only=True)
+    status = StatusLabelField(required=False)
     class Meta:
         model = Task
         fields = ['id', 'title', 'description', 'status', 'deadline', 'created_at', 'owner','subtasks']
@@ -104,11 +138,14 @@ def validate_deadline(value):
     return value
 
 
-class TaskCreateSerializer(serializers.ModelSerializer):
+class TaskCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    status = StatusLabelField(required=False)
+
     class Meta:
         model = Task
-        fields = '__all__'
+        exclude = ['deadline_weekday']
         read_only_fields = ['owner']
     def create(self, validated_data):
-        return Task.objects.create(owner=self.context['request'].user, **validated_data)
+        validated_data.setdefault('owner', self.context['request'].user)
+        return super().create(validated_data)
 
@@ -1,25 +1,188 @@
 
-from django.db.models.signals import pre_save
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from task_hw8.models import Task
+from django.utils import timezone
+from task_hw8.cache import bump_categories_version, bump_user_versions
+from task_hw8.managers import soft_delete_changed
+from task_hw8.models import Category, SubTask, Task
+from task_hw8.notifications import enqueue_status_change
+from task_hw8.stats import apply_task_delta, apply_status_change, adjust_category_task_counts
+
 
 @receiver(pre_save, sender=Task)
-def notify_task_status_change(sender, instance, **kwargs):
-    if not instance.pk:
-        return
-
-    try:
-        previous = Task.objects.get(pk=instance.pk)
-    except Task.DoesNotExist:
-        return
-    if previous.status != instance.status:
-        user = instance.owner
-        if user and user.email:
-            subject = f"Изменение статуса задачи: {instance.title}"
-            message = (
-                f"Здравствуйте, {user.username}!\n\n"
-                f"Статус вашей задачи \"{instance.title}\" изменён с "
-                f"\"{previous.status}\" на \"{instance.status}\".\n"
-            )
-            send_mail(subject, message, 'admin@example.com', [user.email])
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    instance._previous_status = None
+    instance._previous_owner_id = None
+    if raw or not instance.pk:
+        return
+
+    if instance.is_field_tracked('status') and instance.is_field_tracked('owner_id'):
+        # Объект загружен из БД — исходные значения уже известны, запрос не нужен
+        instance._previous_status = instance.get_original('status')
+        instance._previous_owner_id = instance.get_original('owner_id')
+        return
+
+    # Объект собран вручную с pk или колонки были отложены — узнаём состояние из БД
+    previous = Task.objects.filter(pk=instance.pk).values('status', 'owner_id').first()
+    if previous:
+        instance._previous_status = previous['status']
+        instance._previous_owner_id = previous['owner_id']
+
+
+@receiver(post_save, sender=Task)
+def notify_task_status_change(sender, instance, created, raw=False, **kwargs):
+    previous_status = getattr(instance, '_previous_status', None)
+    if raw or created or previous_status is None:
+        return
+
+    if previous_status != instance.status:
+        enqueue_status_change(instance, previous_status)
+
+
+@receiver(post_save, sender=Task)
+def update_task_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_status = getattr(instance, '_previous_status', None)
+    if created or previous_status is None:
+        apply_task_delta(instance.owner_id, instance.status, 1)
+    elif instance._previous_owner_id != instance.owner_id:
+        apply_task_delta(instance._previous_owner_id, previous_status, -1)
+        apply_task_delta(instance.owner_id, instance.status, 1)
+    else:
+        apply_status_change(instance.owner_id, previous_status, instance.status)
+
+
+@receiver(post_delete, sender=Task)
+def update_task_stats_on_delete(sender, instance, **kwargs):
+    apply_task_delta(instance.owner_id, instance.status, -1)
+
+
+@receiver(m2m_changed, sender=Task.categories.through)
+def update_category_task_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # После clear() уже не узнать, какие связи были, запоминаем заранее
+        if not reverse:
+            instance._cleared_ids = list(sender.objects.filter(task_id=instance.pk)
+                                         .values_list('category_id', flat=True))
+        return
+
+    if action == 'post_clear':
+        if reverse:
+            Category.all_objects.filter(pk=instance.pk).update(task_count=0)
+        else:
+            adjust_category_task_counts(getattr(instance, '_cleared_ids', []), -1)
+        return
+
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    delta = 1 if action == 'post_add' else -1
+    if reverse:
+        # instance — категория, pk_set — задачи
+        adjust_category_task_counts([instance.pk], delta * len(pk_set))
+    else:
+        adjust_category_task_counts(pk_set, delta)
+
+
+@receiver(pre_delete, sender=Task)
+def remember_task_categories(sender, instance, **kwargs):
+    # Строки through-таблицы удаляются каскадом без m2m_changed
+    instance._category_ids = list(Task.categories.through.objects.filter(task_id=instance.pk)
+                                  .values_list('category_id', flat=True))
+
+
+@receiver(post_delete, sender=Task)
+def update_category_counts_on_delete(sender, instance, **kwargs):
+    category_ids = getattr(instance, '_category_ids', [])
+    if category_ids:
+        adjust_category_task_counts(category_ids, -1)
+        bump_categories_version()
+
+
+# Категории входят в представление задачи, поэтому их смена меняет updated_at задачи
+
+@receiver(m2m_changed, sender=Task.categories.through)
+def touch_tasks_on_categories_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._cleared_task_ids = list(Task.objects.filter(categories=instance).values_list('pk', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        task_ids = [instance.pk]
+    elif action == 'post_clear':
+        task_ids = getattr(instance, '_cleared_task_ids', [])
+    else:
+        task_ids = pk_set
+    Task.objects.filter(pk__in=task_ids).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Category)
+def touch_tasks_on_category_delete(sender, instance, **kwargs):
+    # Настоящее удаление (hard_delete) убирает строки through-таблицы без m2m_changed
+    Task.objects.filter(categories=instance).update(updated_at=timezone.now())
+
+
+@receiver(soft_delete_changed, sender=Category)
+def touch_tasks_on_category_soft_delete(sender, pks=(), **kwargs):
+    # Связи остаются, но задачи показывают только живые категории — как и при смене связей
+    Task.objects.filter(categories__in=pks).update(updated_at=timezone.now())
+
+
+# Кеш ответов: любая запись инвалидирует версию данных владельца
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def bump_task_cache_version(sender, instance, **kwargs):
+    bump_user_versions([instance.owner_id, getattr(instance, '_previous_owner_id', None)])
+
+
+@receiver(post_save, sender=SubTask)
+@receiver(post_delete, sender=SubTask)
+def bump_subtask_cache_version(sender, instance, **kwargs):
+    # Подзадачи видны и в карточке задачи, её ETag и кеш — по версии владельца задачи
+    if SubTask.task.is_cached(instance):
+        task_owner_id = instance.task.owner_id
+    else:
+        task_owner_id = Task.objects.filter(pk=instance.task_id).values_list('owner_id', flat=True).first()
+    bump_user_versions([instance.owner_id, task_owner_id])
+
+
+@receiver(m2m_changed, sender=Task.categories.through)
+def bump_categories_cache_version(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        instance._cleared_owner_ids = list(Task.objects.filter(categories=instance).values_list('owner_id', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse and action == 'post_clear':
+        bump_user_versions(getattr(instance, '_cleared_owner_ids', []))
+    elif reverse:
+        bump_user_versions(Task.objects.filter(pk__in=pk_set).values_list('owner_id', flat=True))
+    else:
+        bump_user_versions([instance.owner_id])
+    # Изменился task_count категорий
+    bump_categories_version()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(soft_delete_changed, sender=Category)
+def bump_category_cache_version(sender, **kwargs):
+    bump_categories_version()
+
+
+@receiver(soft_delete_changed, sender=Category)
+def bump_owners_on_category_soft_delete(sender, pks=(), **kwargs):
+    # Задачи показывают категории через SoftDeleteManager: удаление и восстановление меняют их ответы
+    bump_user_versions(Task.objects.filter(categories__in=pks).values_list('owner_id', flat=True).distinct())
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_task_owners(sender, instance, **kwargs):
+    # Строки through-таблицы удаляются каскадом без m2m_changed
+    instance._task_owner_ids = list(Task.objects.filter(categories=instance)
+                                    .values_list('owner_id', flat=True).distinct())
+
+
+@receiver(post_delete, sender=Category)
+def bump_owners_on_category_delete(sender, instance, **kwargs):
+    bump_user_versions(getattr(instance, '_task_owner_ids', []))
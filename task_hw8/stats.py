@@ -0,0 +1,130 @@
+from django.db import connections, router, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from task_hw8.cache import bump_categories_version
+from task_hw8.models import Category, Status, Task, TaskStats
+
+
+# Статус задачи -> колонка счётчика в TaskStats
+STATUS_FIELDS = {
+    Status.NEW: "new",
+    Status.IN_PROGRESS: "in_progress",
+    Status.PENDING: "pending",
+    Status.BLOCKED: "blocked",
+    Status.DONE: "done",
+    Status.ARCHIVED: "archived",
+}
+
+
+def apply_task_delta(owner_id, status, delta):
+    """Сдвигает total и счётчик статуса пользователя на delta.
+
+    Если строки статистики ещё нет, ничего не делаем: она будет собрана
+    целиком при первом чтении в get_task_stats.
+    """
+    if owner_id is None:
+        return
+    changes = {'total': F('total') + delta}
+    field = STATUS_FIELDS.get(status)
+    if field:
+        changes[field] = F(field) + delta
+    TaskStats.objects.filter(owner_id=owner_id).update(**changes)
+
+
+def apply_status_change(owner_id, old_status, new_status):
+    if owner_id is None or old_status == new_status:
+        return
+    changes = {}
+    old_field = STATUS_FIELDS.get(old_status)
+    new_field = STATUS_FIELDS.get(new_status)
+    if old_field:
+        changes[old_field] = F(old_field) - 1
+    if new_field:
+        changes[new_field] = F(new_field) + 1
+    if changes:
+        TaskStats.objects.filter(owner_id=owner_id).update(**changes)
+
+
+def recompute_task_stats(owner_ids=None):
+    """Полный пересчёт одним GROUP BY с условными агрегатами.
+
+    Без owner_ids пересчитываются все пользователи, у которых есть задачи.
+    """
+    aggregates = {'total': Count('id')}
+    for status, field in STATUS_FIELDS.items():
+        aggregates[field] = Count('id', filter=Q(status=status))
+
+    tasks = Task.objects.filter(owner__isnull=False)
+    if owner_ids is not None:
+        tasks = tasks.filter(owner_id__in=owner_ids)
+    rows = tasks.order_by().values('owner_id').annotate(**aggregates)
+
+    stats = [TaskStats(**row) for row in rows]
+    found = {row.owner_id for row in stats}
+    if owner_ids is not None:
+        # У пользователей без задач счётчики обнуляются
+        stats += [TaskStats(owner_id=owner_id) for owner_id in set(owner_ids) - found]
+
+    save_task_stats(stats)
+    return stats
+
+
+def save_task_stats(stats):
+    """Upsert строк статистики одним запросом, где бэкенд это умеет."""
+    update_fields = ['total', *STATUS_FIELDS.values()]
+    db = router.db_for_write(TaskStats)
+    features = connections[db].features
+    with transaction.atomic(using=db):
+        if features.supports_update_conflicts_with_target:
+            # PostgreSQL, SQLite: ON CONFLICT (owner_id) DO UPDATE
+            TaskStats.objects.using(db).bulk_create(
+                stats, update_conflicts=True, unique_fields=['owner'], update_fields=update_fields,
+            )
+        elif features.supports_update_conflicts:
+            # MySQL/MariaDB: ON DUPLICATE KEY UPDATE срабатывает по любому уникальному ключу
+            TaskStats.objects.using(db).bulk_create(stats, update_conflicts=True, update_fields=update_fields)
+        else:
+            for row in stats:
+                TaskStats.objects.using(db).update_or_create(
+                    owner_id=row.owner_id,
+                    defaults={field: getattr(row, field) for field in update_fields},
+                )
+
+
+def get_task_stats(owner_id):
+    stats = TaskStats.objects.filter(owner_id=owner_id).first()
+    if stats is None:
+        stats = recompute_task_stats([owner_id])[0]
+    return stats
+
+
+def status_counts(stats):
+    return {
+        status.label: getattr(stats, field)
+        for status, field in STATUS_FIELDS.items()
+        if getattr(stats, field)
+    }
+
+
+def adjust_category_task_counts(category_ids, delta):
+    if category_ids:
+        Category.all_objects.filter(pk__in=category_ids).update(task_count=F('task_count') + delta)
+
+
+def refresh_category_task_counts(category_ids=None):
+    """Пересчитывает task_count одним UPDATE с подзапросом по through-таблице."""
+    through = Task.categories.through
+    counts = through.objects.filter(category_id=OuterRef('pk')).order_by()\
+                    .values('category_id').annotate(count=Count('id')).values('count')
+    categories = Category.all_objects.all()
+    if category_ids is not None:
+        categories = categories.filter(pk__in=category_ids)
+    updated = categories.update(task_count=Coalesce(Subquery(counts), Value(0)))
+    bump_categories_version()
+    return updated
+
+
+def category_task_counts():
+    """Счётчики всех живых категорий одним запросом по денормализованной колонке."""
+    return list(Category.objects.order_by('id').values('id', 'name', 'task_count'))
@@ -0,0 +1,74 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .fast_serializers import values_serializer
+
+
+STREAM_CHUNK_SIZE = 500
+
+STREAM_CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def dumps(data):
+    # Те же настройки, что у JSONRenderer: компактно и без экранирования юникода
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+
+
+def iter_chunks(queryset, chunk_size=STREAM_CHUNK_SIZE):
+    """Отдаёт объекты списками по chunk_size, не загружая весь queryset в память."""
+    chunk = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_serialized(queryset, serializer_class, chunk_size=STREAM_CHUNK_SIZE, context=None):
+    """Сериализованные чанки: по одному списку словарей на чанк, через values(), где это возможно."""
+    fast = values_serializer(serializer_class)
+    if fast is not None:
+        for chunk in iter_chunks(fast.queryset(queryset), chunk_size):
+            yield fast.to_representation(chunk)
+        return
+    for chunk in iter_chunks(queryset, chunk_size):
+        yield serializer_class(chunk, many=True, context=context).data
+
+
+# Каждый чанк кодируется в одну строку, чтобы сервер не писал в сокет по объекту
+
+def stream_json_array(chunks):
+    yield '['
+    separator = ''
+    for chunk in chunks:
+        if chunk:
+            yield separator + ','.join(dumps(item) for item in chunk)
+            separator = ','
+    yield ']'
+
+
+def stream_ndjson(chunks):
+    for chunk in chunks:
+        if chunk:
+            yield ''.join(dumps(item) + '\n' for item in chunk)
+
+
+def streaming_response(request, queryset, serializer_class, chunk_size=STREAM_CHUNK_SIZE):
+    """StreamingHttpResponse для ?stream=json|ndjson, иначе None.
+
+    Память ограничена одним чанком, первые байты уходят после первого запроса к БД.
+    """
+    mode = request.query_params.get('stream')
+    if mode not in STREAM_CONTENT_TYPES:
+        return None
+
+    chunks = iter_serialized(queryset, serializer_class, chunk_size, context={'request': request})
+    body = stream_json_array(chunks) if mode == 'json' else stream_ndjson(chunks)
+    return StreamingHttpResponse(body, content_type=STREAM_CONTENT_TYPES[mode])
@@ -1,3 +1,1021 @@
-from django.test import TestCase
+import json
+import logging
+import time
+from collections import Counter
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from task_hw8.authentication import VerifiedTokenCache, token_cache
+from task_hw8.blacklist import BlacklistCache, BloomFilter, CachedBlacklistRefreshToken, blacklist_cache
+from task_hw8.cache import USER_SCOPE, get_cache, modified_key
+from task_hw8.checks import check_shared_response_cache
+from task_hw8.export import stream_csv, stream_ndjson
+from task_hw8.fast_serializers import values_serializer
+from task_hw8.log_handlers import QueuedHandler, SQLSampleFilter
+from task_hw8.metrics import PerformanceMiddleware, route_metrics
+from task_hw8.models import Category, NotificationOutbox, Status, SubTask, Task, TaskStats, parse_status
+from task_hw8.optimizers import optimize_queryset
+from task_hw8.routers import PIN_COOKIE, ReadReplicaRouter, ReplicaRoutingMiddleware, _replica_reads, pin_key, use_replica
+from task_hw8.serializers import SubTaskSerializer, TaskCreateSerializer, TaskDetailSerializer, TaskSerializer
+from task_hw8.stats import STATUS_FIELDS, get_task_stats, recompute_task_stats
+from task_hw8.streaming import iter_serialized
+
+
+class APITestCase(TestCase):
+    def setUp(self):
+        # Кеш ответов живёт в locmem и переживает откат транзакции теста
+        get_cache().clear()
+        self.user = User.objects.create_user('owner', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.deadline = timezone.now() + timedelta(days=3)
+
+    def create_task(self, title, status=Status.NEW, categories=(), subtasks=0):
+        task = Task.objects.create(owner=self.user, title=title, status=status, deadline=self.deadline)
+        task.categories.set(categories)
+        for i in range(subtasks):
+            SubTask.objects.create(owner=self.user, task=task, title=f'{title} / {i}',
+                                   status=Status.IN_PROGRESS, deadline=self.deadline)
+        return task
+
+
+class ValuesSerializerTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        first, second, deleted = (Category.objects.create(name=name) for name in ('first', 'second', 'deleted'))
+        for i in range(8):
+            self.create_task(f'task {i}', status=list(Status)[i % len(Status)],
+                             categories=[first, second, deleted][:i % 4], subtasks=i % 3)
+        Task.objects.filter(title='task 1').update(description='описание "с кавычками"')
+        deleted.delete()
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def get_without_fast_path(self, url, params=None):
+        get_cache().clear()
+        with mock.patch('task_hw8.fast_serializers.values_serializer', return_value=None):
+            return self.client.get(url, params)
+
+    def test_serializers_match_drf(self):
+        cases = [
+            (TaskSerializer, Task.objects.filter(owner=self.user)),
+            (TaskCreateSerializer, Task.objects.filter(owner=self.user)),
+            (SubTaskSerializer, SubTask.objects.filter(owner=self.user)),
+        ]
+        for serializer_class, queryset in cases:
+            with self.subTest(serializer=serializer_class.__name__):
+                fast = values_serializer(serializer_class)
+                self.assertIsNotNone(fast)
+                self.assertEqual(self.render(fast.to_representation(fast.queryset(queryset))),
+                                 self.render(serializer_class(queryset, many=True).data))
+
+    def test_list_endpoints_match_drf(self):
+        for url, params in [('/tasks/', None), ('/tasks/', {'page': 2}), ('/tasks/', {'pagination': 'cursor'}),
+                            ('/subtasks/list/', None), ('/subtasks/list/', {'status': 'in progress'})]:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, self.get_without_fast_path(url, params).content)
+
+    def test_all_tasks_matches_drf(self):
+        response = self.client.get('/tasks/all/')
+        self.assertEqual(response.status_code, 200)
+        tasks = Task.objects.filter(owner=self.user)
+        self.assertEqual(response.content, self.render(TaskSerializer(tasks, many=True).data))
+
+    def test_unsupported_serializer_falls_back(self):
+        self.assertIsNone(values_serializer(TaskDetailSerializer))
+
+
+class TaskStatsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name='work')
+
+    def assertStatsMatch(self):
+        stats = get_task_stats(self.user.id)
+        statuses = Counter(Task.objects.filter(owner=self.user).values_list('status', flat=True))
+        self.assertEqual(stats.total, sum(statuses.values()))
+        for status, field in STATUS_FIELDS.items():
+            self.assertEqual(getattr(stats, field), statuses[status], field)
+
+    def test_single_object_writes(self):
+        response = self.client.post('/tasks/', {'title': 'one', 'deadline': self.deadline.isoformat(),
+                                                'categories': [self.category.pk]}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        pk = response.json()['id']
+        self.assertStatsMatch()
+        response = self.client.patch(f'/tasks/{pk}/', {'status': 'Done', 'deadline': self.deadline.isoformat()},
+                                     format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertStatsMatch()
+        self.assertEqual(self.client.delete(f'/tasks/{pk}/').status_code, 204)
+        self.assertStatsMatch()
+
+    def test_recompute_updates_existing_row(self):
+        self.create_task('new')
+        self.create_task('done', status=Status.DONE)
+        TaskStats.objects.filter(owner=self.user).update(total=100, new=50, done=0)
+        recompute_task_stats([self.user.id])
+        self.assertEqual(TaskStats.objects.filter(owner=self.user).count(), 1)
+        self.assertStatsMatch()
+
+    def test_recompute_without_upsert_support(self):
+        # Бэкенд без bulk_create(update_conflicts=True) — построчный update_or_create
+        self.create_task('new')
+        get_task_stats(self.user.id)
+        self.create_task('done', status=Status.DONE)
+        TaskStats.objects.filter(owner=self.user).update(total=0, new=0)
+        with mock.patch.object(connection.features, 'supports_update_conflicts', False), \
+                mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            recompute_task_stats([self.user.id])
+        self.assertEqual(TaskStats.objects.filter(owner=self.user).count(), 1)
+        self.assertStatsMatch()
+
+    def test_statistics_endpoint(self):
+        self.create_task('new')
+        self.create_task('done', status=Status.DONE)
+        Task.objects.filter(title='new').update(deadline=timezone.now() - timedelta(days=1))
+        response = self.client.get('/tasks/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'total_tasks': 2,
+            'status_counts': {Status.NEW.label: 1, Status.DONE.label: 1},
+            'overdue_tasks': 1,
+        })
+        self.assertIn(APIClient().get('/tasks/stats/').status_code, (401, 403))
+
+
+class BulkWriteTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.work = Category.objects.create(name='work')
+        self.home = Category.objects.create(name='home')
+
+    def test_bulk_writes(self):
+        items = [{'title': f'bulk {i}', 'deadline': self.deadline.isoformat(), 'status': 'In progress',
+                  'categories': [self.work.pk, self.home.pk][:i % 2 + 1]} for i in range(4)]
+        response = self.client.post('/tasks/bulk/', items, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        pks = [item['id'] for item in response.json()]
+        self.assertEqual([item['title'] for item in response.json()], [item['title'] for item in items])
+
+        response = self.client.patch('/tasks/bulk/', [
+            {'id': pks[0], 'status': 'Done', 'deadline': self.deadline.isoformat()},
+            {'id': pks[1], 'categories': [self.home.pk], 'deadline': self.deadline.isoformat()},
+        ], format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(Task.objects.get(pk=pks[0]).status, Status.DONE)
+        self.assertEqual(list(Task.objects.get(pk=pks[1]).categories.values_list('pk', flat=True)), [self.home.pk])
+        stats = get_task_stats(self.user.id)
+        self.assertEqual((stats.total, stats.in_progress, stats.done), (4, 3, 1))
+
+        response = self.client.delete('/tasks/bulk/', pks[:3], format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(list(Task.objects.values_list('pk', flat=True)), pks[3:])
+        self.assertEqual(get_task_stats(self.user.id).total, 1)
+
+    def test_bulk_delete_rejects_booleans(self):
+        task = self.create_task('keep')
+        response = self.client.delete('/tasks/bulk/', [True], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Task.objects.filter(pk=task.pk).exists())
+
+    def test_patch_rejects_malformed_ids(self):
+        task = self.create_task('keep')
+        for bad_id in (str(task.pk), 'abc', [task.pk], {'pk': task.pk}, True, 1.5, None):
+            with self.subTest(id=bad_id):
+                response = self.client.patch('/tasks/bulk/', [
+                    {'id': task.pk, 'status': 'Done', 'deadline': self.deadline.isoformat()},
+                    {'id': bad_id, 'status': 'Done', 'deadline': self.deadline.isoformat()},
+                ], format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['errors'], [{}, {'id': ['Ожидается целое число.']}])
+        self.assertEqual(Task.objects.get(pk=task.pk).status, Status.NEW)
+
+    def test_patch_rejects_non_objects(self):
+        response = self.client.patch('/tasks/bulk/', [1, 'x'], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [{'non_field_errors': ['Ожидается объект.']}] * 2)
+
+
+@override_settings(SERVER_TIMING_HEADER=True)
+class PerformanceMiddlewareTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        route_metrics.reset()
+        self.create_task('task', categories=[Category.objects.create(name='work')])
+
+    def sql_queries(self, response):
+        # db;dur=1.2;desc="5 queries", ...
+        db = response['Server-Timing'].split(', ')[0]
+        return int(db.split('desc="')[1].split()[0])
+
+    def test_server_timing(self):
+        response = self.client.get('/tasks/')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(self.sql_queries(response), 0)
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+    def test_metrics(self):
+        self.client.get('/tasks/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="tasks/",status="200"} 1',
+                      response.content.decode())
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.1').status_code, 403)
+
+    def test_async_capable(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(iscoroutinefunction(PerformanceMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(PerformanceMiddleware(lambda request: None)))
+
+    async def test_async_request_counts_sql(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await AsyncClient().get('/async/tasks/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(self.sql_queries(response), 0)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.user = User.objects.create_user('owner', password='secret')
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def get_response(self, request):
+        self.seen.append(_replica_reads.get())
+        return HttpResponse(status=201 if request.method == 'POST' else 200)
+
+    async def aget_response(self, request):
+        return self.get_response(request)
+
+    def request(self, method, cookies=None):
+        request = getattr(self.factory, method)('/tasks/')
+        request.user = self.user
+        request.COOKIES.update(cookies or {})
+        return request
+
+    def test_write_pins_client(self):
+        middleware = ReplicaRoutingMiddleware(self.get_response)
+        middleware(self.request('get'))
+        response = middleware(self.request('post'))
+        self.assertEqual(response.cookies[PIN_COOKIE].value, '1')
+        self.assertIsNotNone(get_cache().get(pin_key(f'user:{self.user.pk}')))
+        middleware(self.request('get', {PIN_COOKIE: '1'}))
+        self.assertEqual(self.seen, [True, False, False])
+
+    def test_pin_by_cache_without_cookie(self):
+        # API-клиент без cookie: закрепление находится по пользователю из JWT
+        get_cache().set(pin_key(f'user:{self.user.pk}'), 1)
+        request = self.factory.get('/tasks/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        ReplicaRoutingMiddleware(self.get_response)(request)
+        self.assertEqual(self.seen, [False])
+
+    async def test_async_chain(self):
+        middleware = ReplicaRoutingMiddleware(self.aget_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(self.request('get'))
+        response = await middleware(self.request('post'))
+        self.assertEqual(response.cookies[PIN_COOKIE].value, '1')
+        self.assertIsNotNone(await get_cache().aget(pin_key(f'user:{self.user.pk}')))
+        await middleware(self.request('get', {PIN_COOKIE: '1'}))
+        self.assertEqual(self.seen, [True, False, False])
+
+    def test_router_keeps_transactions_on_default(self):
+        router = ReadReplicaRouter()
+        self.assertEqual(router.db_for_read(Task), 'default')
+        with use_replica():
+            # TestCase держит открытую транзакцию на default
+            self.assertEqual(router.db_for_read(Task), 'default')
+        self.assertEqual(router.db_for_write(Task), 'default')
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name='work')
+        self.task = self.create_task('task', categories=[self.category], subtasks=1)
+
+    def test_etag(self):
+        for url in ('/tasks/', f'/tasks/{self.task.pk}/', '/subtasks/list/'):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+                self.category.delete()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.category.restore()
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_etag_changes_on_delete(self):
+        url = f'/tasks/{self.task.pk}/'
+        etag = self.client.get(url)['ETag']
+        SubTask.objects.get(task=self.task).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_subtask_of_another_user_changes_task_etag(self):
+        url = f'/tasks/{self.task.pk}/'
+        etag = self.client.get(url)['ETag']
+        other = User.objects.create_user('other', password='secret')
+        SubTask.objects.create(owner=other, task_id=self.task.pk, title='чужая', status=Status.NEW,
+                               deadline=self.deadline)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_last_modified(self):
+        modified = int(time.time()) - 10
+        get_cache().set(modified_key(USER_SCOPE, self.user.pk), modified)
+        response = self.client.get('/tasks/')
+        last_modified = response['Last-Modified']
+        self.assertEqual(self.client.get('/tasks/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        self.create_task('new')
+        # Запись в текущей секунде: Last-Modified не отдаётся, старый If-Modified-Since не даёт 304
+        response = self.client.get('/tasks/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+
+
+class CursorPaginationTests(APITestCase):
+    def walk(self, url, params):
+        ids, response = [], self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [item['id'] for item in response.json()['results']]
+            if not response.json()['next']:
+                return ids
+            response = self.client.get(response.json()['next'])
+
+    def test_equal_created_at(self):
+        tasks = [self.create_task(f'task {i}', subtasks=1) for i in range(13)]
+        # Половина строк с одинаковым created_at — порядок внутри них задаёт id
+        Task.objects.filter(pk__in=[task.pk for task in tasks[3:10]]).update(created_at=self.deadline)
+        SubTask.objects.update(created_at=self.deadline)
+        for url, model in (('/tasks/', Task), ('/subtasks/', SubTask), ('/subtasks/list/', SubTask)):
+            with self.subTest(url=url):
+                expected = list(model.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+                self.assertEqual(self.walk(url, {'pagination': 'cursor'}), expected)
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name='work')
+        self.task = self.create_task('task', categories=[self.category])
+
+    def categories_in_list(self, response):
+        return response.json()['results'][0]['categories']
+
+    def test_write_invalidates(self):
+        self.assertEqual(self.client.get('/tasks/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/tasks/')['X-Cache'], 'HIT')
+        response = self.client.patch(f'/tasks/{self.task.pk}/', {'title': 'renamed', 'deadline': self.deadline.isoformat()},
+                                     format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        response = self.client.get('/tasks/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['title'], 'renamed')
+
+    def test_category_soft_delete(self):
+        self.client.get('/tasks/')
+        self.category.delete()
+        response = self.client.get('/tasks/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self.categories_in_list(response), [])
+        self.category.restore()
+        response = self.client.get('/tasks/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self.categories_in_list(response), [self.category.pk])
+
+    def test_queryset_soft_delete(self):
+        self.client.get('/tasks/')
+        Category.objects.filter(pk=self.category.pk).delete()
+        self.assertEqual(self.categories_in_list(self.client.get('/tasks/')), [])
+
+    def test_shared_cache_check(self):
+        self.assertEqual([error.id for error in check_shared_response_cache(None)], ['task_hw8.W001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                                   'LOCATION': 'redis://localhost:6379/1'}}):
+            self.assertEqual(check_shared_response_cache(None), [])
+
+
+class SoftDeleteTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.work, self.home = Category.objects.create(name='work'), Category.objects.create(name='home')
+        self.task = self.create_task('task', categories=[self.work, self.home])
+
+    def test_queryset_delete_is_soft(self):
+        self.assertEqual(Category.objects.filter(pk=self.work.pk).delete(), 1)
+        self.assertEqual(list(Category.objects.values_list('name', flat=True)), ['home'])
+        self.assertTrue(Category.all_objects.get(pk=self.work.pk).is_deleted)
+        self.assertEqual(list(self.task.categories.values_list('name', flat=True)), ['home'])
+
+    def test_restore(self):
+        self.work.delete()
+        self.assertEqual(Category.objects.deleted().restore(), 1)
+        self.assertEqual(Category.objects.count(), 2)
+        self.home.delete()
+        self.home.restore()
+        self.assertFalse(Category.all_objects.get(pk=self.home.pk).is_deleted)
+
+    def test_all_objects_delete_is_hard(self):
+        self.work.delete()
+        Category.all_objects.filter(pk=self.work.pk).delete()
+        self.assertFalse(Category.all_objects.filter(pk=self.work.pk).exists())
+        self.assertFalse(Task.categories.through.objects.filter(category_id=self.work.pk).exists())
+
+
+class QueryPlanTests(APITestCase):
+    def test_endpoint_queries_use_indexes(self):
+        self.create_task('task', subtasks=1)
+        out = StringIO()
+        call_command('explain_queries', owner=self.user.pk, stdout=out)
+        self.assertNotIn('FAIL', out.getvalue())
+
+
+class WeekdayFilterTests(APITestCase):
+    def test_filter_by_weekday(self):
+        start = timezone.localtime(self.deadline).replace(hour=12)
+        for i in range(7):
+            Task.objects.create(owner=self.user, title=f'day {i}', status=Status.NEW, deadline=start + timedelta(days=i))
+        monday = next(task for task in Task.objects.all() if timezone.localtime(task.deadline).weekday() == 0)
+        response = self.client.get('/tasks/by-weekday/', {'weekday': 'monday'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.json()['results']], [monday.pk])
+
+        # Сохранение с новым дедлайном пересчитывает день недели
+        monday.deadline += timedelta(days=1)
+        monday.save(update_fields=['deadline'])
+        self.assertEqual(Task.objects.get(pk=monday.pk).deadline_weekday, 1)
+        self.assertEqual(self.client.get('/tasks/by-weekday/', {'weekday': 'Monday'}).json()['results'], [])
+
+    def test_invalid_weekday(self):
+        self.assertEqual(self.client.get('/tasks/by-weekday/', {'weekday': 'someday'}).status_code, 400)
+
+    def test_requires_authentication(self):
+        self.assertIn(APIClient().get('/tasks/by-weekday/').status_code, (401, 403))
+
+
+class QuerySetOptimizerTests(APITestCase):
+    def count_queries(self, func):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        return len(context)
+
+    def test_detail_serializer_queries_do_not_grow(self):
+        def serialize():
+            queryset = optimize_queryset(Task.objects.filter(owner=self.user), TaskDetailSerializer())
+            return TaskDetailSerializer(queryset, many=True).data
+
+        self.create_task('first', subtasks=1)
+        baseline = self.count_queries(serialize)
+        for i in range(4):
+            self.create_task(f'more {i}', subtasks=3)
+        self.assertEqual(self.count_queries(serialize), baseline)
+
+    def test_detail_endpoint_queries_do_not_grow(self):
+        few, many = self.create_task('few', subtasks=1), self.create_task('many', subtasks=6)
+        queries = [self.count_queries(lambda pk=task.pk: self.client.get(f'/tasks/{pk}/')) for task in (few, many)]
+        self.assertEqual(queries[0], queries[1])
+
+
+class StreamingTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name='work')
+        for i in range(7):
+            self.create_task(f'task {i}', categories=[category])
+
+    def streamed(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_stream_matches_plain_response(self):
+        expected = self.client.get('/tasks/all/').json()
+        body = self.streamed(self.client.get('/tasks/all/', {'stream': 'json'}))
+        self.assertEqual(json.loads(body), expected)
+        body = self.streamed(self.client.get('/tasks/all/', {'stream': 'ndjson'}))
+        self.assertEqual([json.loads(line) for line in body.splitlines()], expected)
+
+    def test_chunks(self):
+        chunks = list(iter_serialized(Task.objects.order_by('pk'), TaskSerializer, chunk_size=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+
+    def test_requires_authentication(self):
+        self.assertIn(APIClient().get('/tasks/all/', {'stream': 'ndjson'}).status_code, (401, 403))
+
+
+class FieldTrackingTests(APITestCase):
+    def task_selects(self, func):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        return [query['sql'] for query in context if query['sql'].startswith('SELECT')
+                and 'FROM "task_hw8_task"' in query['sql']]
+
+    def test_save_of_loaded_task_skips_select(self):
+        task = Task.objects.get(pk=self.create_task('task').pk)
+        task.status = Status.DONE
+        self.assertEqual(self.task_selects(task.save), [])
+        self.assertEqual(NotificationOutbox.objects.get().new_status, Status.DONE.label)
+        self.assertFalse(task.has_changed('status'))
+
+    def test_manual_instance_falls_back_to_select(self):
+        task = self.create_task('task')
+        manual = Task(pk=task.pk, owner=self.user, title='task', status=Status.DONE, deadline=self.deadline)
+        self.assertEqual(len(self.task_selects(lambda: manual.save(update_fields=['status']))), 1)
+        self.assertEqual(NotificationOutbox.objects.get().old_status, Status.NEW.label)
+
+    def test_deferred_fields_are_not_tracked(self):
+        task = Task.objects.only('id', 'title').get(pk=self.create_task('task').pk)
+        self.assertTrue(task.is_field_tracked('title'))
+        self.assertFalse(task.is_field_tracked('status'))
+        task.title = 'renamed'
+        self.assertEqual(task.changed_fields(), {'title': ('task', 'renamed')})
+
+
+class NotificationOutboxTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.email = 'owner@example.com'
+        self.user.save()
+        self.first, self.second = self.create_task('first'), self.create_task('second')
+
+    def change_status(self, task, status):
+        task.status = status
+        task.save()
+
+    def send(self, **options):
+        call_command('send_notifications', once=True, stdout=StringIO(), **options)
+
+    def test_changes_are_sent_as_one_summary(self):
+        self.change_status(self.first, Status.IN_PROGRESS)
+        self.change_status(self.first, Status.DONE)
+        self.change_status(self.second, Status.BLOCKED)
+        self.assertEqual(len(mail.outbox), 0)
+        self.send(coalesce_seconds=0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('"first": "New" -> "Done"', mail.outbox[0].body)
+        self.assertIn('"second": "New" -> "Blocked"', mail.outbox[0].body)
+        self.assertFalse(NotificationOutbox.objects.filter(sent_at__isnull=True).exists())
+
+    def test_waits_for_quiet_period(self):
+        self.change_status(self.first, Status.DONE)
+        self.send(coalesce_seconds=60)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(NotificationOutbox.objects.filter(sent_at__isnull=True).count(), 1)
+
+    def test_reverted_change_is_not_sent(self):
+        self.change_status(self.first, Status.DONE)
+        self.change_status(self.first, Status.NEW)
+        self.send(coalesce_seconds=0)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(NotificationOutbox.objects.filter(sent_at__isnull=True).exists())
+
+
+class VerifiedTokenCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='secret')
+        self.tokens = [str(AccessToken.for_user(self.user)) for _ in range(3)]
+
+    def test_token_is_decoded_once(self):
+        cache = VerifiedTokenCache()
+        token = cache.get(self.tokens[0])
+        with mock.patch.object(AccessToken, '__init__', side_effect=AssertionError('повторный разбор')):
+            self.assertIs(cache.get(self.tokens[0]), token)
+            self.assertIs(cache.get(self.tokens[0].encode()), token)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = VerifiedTokenCache(maxsize=2)
+        first = cache.get(self.tokens[0])
+        cache.get(self.tokens[1])
+        cache.get(self.tokens[0])
+        cache.get(self.tokens[2])
+        self.assertEqual(len(cache._tokens), 2)
+        self.assertIs(cache.get(self.tokens[0]), first)
+        self.assertNotIn((AccessToken, self.tokens[1]), cache._tokens)
+
+    def test_expired_token_is_rejected(self):
+        cache = VerifiedTokenCache()
+        token = cache.get(self.tokens[0])
+        token['exp'] = int(time.time()) - 1
+        with self.assertRaises(TokenError):
+            cache.get(self.tokens[0])
+        self.assertEqual(len(cache._tokens), 0)
+
+    def test_invalid_token_is_not_cached(self):
+        cache = VerifiedTokenCache()
+        with self.assertRaises(TokenError):
+            cache.get(self.tokens[0][:-2])
+        self.assertEqual(len(cache._tokens), 0)
+
+    def test_api_request_with_bearer_token(self):
+        token_cache.clear()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens[0]}')
+        for _ in range(2):
+            self.assertEqual(client.get('/tasks/').status_code, 200)
+        self.assertIn((AccessToken, self.tokens[0]), token_cache._tokens)
+
+
+class BlacklistCacheTests(TestCase):
+    def setUp(self):
+        blacklist_cache.reset()
+        self.user = User.objects.create_user('owner', password='secret')
+        self.client = APIClient()
+
+    def refresh(self, token):
+        return self.client.post('/api/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_unknown_jti_needs_no_query(self):
+        blacklist_cache.is_blacklisted('warm-up')
+        with self.assertNumQueries(0):
+            self.assertFalse(blacklist_cache.is_blacklisted('not-blacklisted'))
+
+    def test_blacklisted_refresh_token_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        CachedBlacklistRefreshToken(str(token)).blacklist()
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_logout_blacklists_refresh_token(self):
+        token = RefreshToken.for_user(self.user)
+        self.client.force_authenticate(self.user)
+        self.client.cookies['refresh_token'] = str(token)
+        self.assertEqual(self.client.post('/api/logout/').status_code, 200)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_other_process_blacklist_is_loaded(self):
+        cache = BlacklistCache(max_staleness=0)
+        token = RefreshToken.for_user(self.user)
+        jti = token['jti']
+        self.assertFalse(cache.is_blacklisted(jti))
+        # Токен отозван в другом процессе: этот узнаёт о нём при догрузке новых строк
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+        self.assertTrue(cache.is_blacklisted(jti))
+
+
+class CategoryTaskCountTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.work = Category.objects.create(name='work')
+        self.home = Category.objects.create(name='home')
+
+    def assertCountsMatch(self):
+        through = Task.categories.through.objects
+        for category in Category.all_objects.all():
+            self.assertEqual(category.task_count, through.filter(category=category).count(), category.name)
+
+    def test_single_object_writes(self):
+        task = self.create_task('one', categories=[self.work])
+        self.assertCountsMatch()
+        task.categories.set([self.home])
+        self.assertCountsMatch()
+        self.home.task_set.clear()
+        self.assertCountsMatch()
+        task.categories.add(self.work, self.home)
+        task.delete()
+        self.assertCountsMatch()
+
+    def test_bulk_writes(self):
+        items = [{'title': f'bulk {i}', 'deadline': self.deadline.isoformat(),
+                  'categories': [self.work.pk, self.home.pk][:i % 2 + 1]} for i in range(4)]
+        pks = [item['id'] for item in self.client.post('/tasks/bulk/', items, format='json').json()]
+        self.assertCountsMatch()
+        self.client.patch('/tasks/bulk/', [{'id': pks[1], 'categories': [self.work.pk],
+                                            'deadline': self.deadline.isoformat()}], format='json')
+        self.assertCountsMatch()
+        self.client.delete('/tasks/bulk/', pks[:3], format='json')
+        self.assertCountsMatch()
+
+    def test_counts_endpoint(self):
+        self.create_task('one', categories=[self.work, self.home])
+        self.create_task('two', categories=[self.work])
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/categories/task-counts/')
+        self.assertEqual(response.json(), [
+            {'id': self.work.pk, 'name': 'work', 'task_count': 2},
+            {'id': self.home.pk, 'name': 'home', 'task_count': 1},
+        ])
+
+    def test_reconcile_command(self):
+        self.create_task('one', categories=[self.work])
+        Category.all_objects.update(task_count=10)
+        call_command('reconcile_category_counts', stdout=StringIO())
+        self.assertCountsMatch()
+
+
+class FullTextSearchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.report = self.create_task('Квартальный отчёт', subtasks=1)
+        self.create_task('Купить молоко')
+        Task.objects.filter(pk=self.report.pk).update(description='Собрать цифры для отчёта по продажам')
+
+    def search(self, url, query):
+        response = self.client.get(url, {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [item['title'] for item in response.json()['results']]
+
+    def test_prefix_words(self):
+        self.assertEqual(self.search('/tasks/', 'отч'), ['Квартальный отчёт'])
+        self.assertEqual(self.search('/tasks/', 'цифры продаж'), ['Квартальный отчёт'])
+        self.assertEqual(self.search('/tasks/', 'цифры молоко'), [])
+        self.assertEqual(self.search('/subtasks/', 'Квартальный'), ['Квартальный отчёт / 0'])
+
+    def test_index_follows_writes(self):
+        self.report.title = 'Годовой план'
+        self.report.save()
+        self.assertEqual(self.search('/tasks/', 'квартальный'), [])
+        self.assertEqual(self.search('/tasks/', 'годовой'), ['Годовой план'])
+        self.report.delete()
+        self.assertEqual(self.search('/tasks/', 'годовой'), [])
+
+    def test_ranked_by_relevance(self):
+        relevant = self.create_task('Молоко, молоко и ещё раз молоко')
+        # Старше остальных: первой её ставит только релевантность
+        Task.objects.filter(pk=relevant.pk).update(created_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(self.search('/tasks/', 'молоко'), ['Молоко, молоко и ещё раз молоко', 'Купить молоко'])
+
+    def test_punctuation_only_query(self):
+        self.assertEqual(self.search('/tasks/', '!!!'), [])
+
+
+class StatusEncodingTests(APITestCase):
+    def test_parse_status(self):
+        for value in ('In progress', 'in PROGRESS', ' in progress ', '2', 2, Status.IN_PROGRESS):
+            with self.subTest(value=value):
+                self.assertIs(parse_status(value), Status.IN_PROGRESS)
+        for value in ('progress', '', '99', 99, None):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_status(value))
+
+    def test_model_accepts_labels(self):
+        task = self.create_task('task', status='Done')
+        self.assertEqual(task.status, Status.DONE)
+        self.assertEqual(Task.objects.filter(status='done').get(), task)
+        self.assertEqual(Task.objects.filter(status__iexact='DONE').get(), task)
+        self.assertEqual(Task.objects.values_list('status', flat=True).get(), Status.DONE)
+
+    def test_api_uses_labels(self):
+        self.create_task('new')
+        self.create_task('blocked', status=Status.BLOCKED)
+        response = self.client.get('/tasks/', {'status': 'BLOCKED'})
+        self.assertEqual([item['status'] for item in response.json()['results']], ['Blocked'])
+        self.assertEqual(self.client.get('/tasks/', {'status': 'unknown'}).status_code, 400)
+        category = Category.objects.create(name='work')
+        response = self.client.post('/tasks/', {'title': 'bad', 'status': 'unknown', 'categories': [category.pk],
+                                                'deadline': self.deadline.isoformat()}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.json())
+
+
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name='work')
+        for i in range(7):
+            self.create_task(f'task {i}', status=list(Status)[i % len(Status)], categories=[category], subtasks=i % 2)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def without_links(self, data):
+        # next/previous ведут на свой путь, /async/... или /...
+        return {key: value for key, value in data.items() if key not in ('next', 'previous')}
+
+    def test_responses_match_drf_views(self):
+        task = Task.objects.first()
+        for async_url, url, params in [
+            ('/async/tasks/', '/tasks/', {'page': 2}),
+            ('/async/tasks/', '/tasks/', {'status': 'done'}),
+            (f'/async/tasks/{task.pk}/', f'/tasks/{task.pk}/', {}),
+            ('/async/subtasks/', '/subtasks/', {}),
+            ('/async/tasks/stats/', '/tasks/stats/', {}),
+        ]:
+            with self.subTest(url=async_url, params=params):
+                # Синхронный Client вызывает async-представление через async_to_sync
+                response = self.client.get(async_url, params, **self.auth)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.without_links(response.json()),
+                                 self.without_links(self.client.get(url, params).json()))
+
+    def test_missing_task(self):
+        self.assertEqual(self.client.get('/async/tasks/0/', **self.auth).status_code, 404)
+
+    async def test_async_client(self):
+        client = AsyncClient()
+        self.assertEqual((await client.get('/async/tasks/')).status_code, 401)
+        headers = {'Authorization': self.auth['HTTP_AUTHORIZATION']}
+        self.assertEqual((await client.get('/async/tasks/', {'page': 9}, headers=headers)).status_code, 404)
+        response = await client.get('/async/tasks/', headers=headers)
+        self.assertEqual(response.json()['count'], 7)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class LogHandlerTests(SimpleTestCase):
+    def record(self, message, duration=None):
+        record = logging.LogRecord('django.db.backends', logging.DEBUG, __file__, 1, message, None, None)
+        if duration is not None:
+            record.duration = duration
+        return record
+
+    def test_records_are_written_by_listener(self):
+        target = ListHandler()
+        handler = QueuedHandler(target)
+        handler.setFormatter(logging.Formatter('[{levelname}] {message}', style='{'))
+        for i in range(3):
+            handler.handle(self.record(f'SELECT {i}'))
+        handler.close()
+        self.assertEqual(target.lines, ['[DEBUG] SELECT 0', '[DEBUG] SELECT 1', '[DEBUG] SELECT 2'])
+
+    def test_full_queue_drops_records(self):
+        target = ListHandler()
+        handler = QueuedHandler(target, max_queue_size=1)
+        handler.listener.stop()
+        for i in range(3):
+            handler.handle(self.record(f'SELECT {i}'))
+        self.assertEqual(handler.dropped, 2)
+        handler.listener.start()
+        handler.close()
+        self.assertEqual(target.lines, ['SELECT 0'])
+
+    def test_sql_sample_filter(self):
+        self.assertFalse(SQLSampleFilter(sample_rate=0).filter(self.record('SELECT 1', duration=0.001)))
+        self.assertTrue(SQLSampleFilter(sample_rate=1).filter(self.record('SELECT 1', duration=0.001)))
+        slow = self.record('SELECT 1', duration=0.5)
+        self.assertTrue(SQLSampleFilter(sample_rate=0, slow_ms=200).filter(slow))
+        self.assertEqual(slow.levelname, 'WARNING')
+
+
+class GenerateDataTests(TestCase):
+    def generate(self, **options):
+        call_command('generate_data', users=5, tasks=60, categories=4, batch_size=25, stdout=StringIO(), **options)
+
+    def test_counts_and_derived_data(self):
+        self.generate()
+        self.assertEqual(User.objects.filter(username__startswith='gen-').count(), 5)
+        self.assertEqual(Category.objects.count(), 4)
+        self.assertEqual(Task.objects.count(), 60)
+        for task in Task.objects.all():
+            self.assertEqual(task.deadline_weekday, timezone.localtime(task.deadline).weekday())
+        for stats in TaskStats.objects.all():
+            self.assertEqual(stats.total, Task.objects.filter(owner_id=stats.owner_id).count())
+        through = Task.categories.through.objects
+        for category in Category.objects.all():
+            self.assertEqual(category.task_count, through.filter(category=category).count())
+        self.assertTrue(User.objects.get(username='gen-000000').check_password('bench-password'))
+
+    def test_same_seed_same_data(self):
+        self.generate(prefix='a', seed=7)
+        self.generate(prefix='b', seed=7)
+        titles = {prefix: [title.rsplit(' ', 1)[0] for title in Task.objects.filter(owner__username__startswith=f'{prefix}-')
+                           .order_by('pk').values_list('title', flat=True)]
+                  for prefix in 'ab'}
+        self.assertEqual(len(titles['a']), 60)
+        self.assertEqual(titles['a'], titles['b'])
+
+    def test_prefix_must_be_new(self):
+        self.generate()
+        with self.assertRaises(CommandError):
+            self.generate()
+
+
+class ImportTests(APITestCase):
+    def upload(self, name, content, params=''):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post(f'/tasks/import/{params}', {'file': upload}, format='multipart')
+
+    def test_csv(self):
+        deadline = self.deadline.isoformat()
+        subtasks = json.dumps([{'title': 'шаг 1', 'deadline': deadline, 'status': 'in progress'}]).replace('"', '""')
+        archived = Category.objects.create(name='архив')
+        archived.delete()
+        content = (
+            'title,description,status,deadline,categories,subtasks\n'
+            f'Отчёт,,Done,{deadline},работа;архив,"{subtasks}"\n'
+            f'Покупки,молоко,,{self.deadline.date().isoformat()},,\n'
+            f'Плохая,,непонятно,{deadline},,\n'
+            f'Отчёт,,,{deadline},,\n'
+        )
+        response = self.upload('tasks.csv', content)
+        self.assertEqual(response.status_code, 201, response.content)
+        data = response.json()
+        self.assertEqual((data['processed'], data['tasks_created'], data['subtasks_created'], data['categories_created']),
+                         (4, 2, 1, 1))
+        self.assertEqual([(error['line'], list(error['errors'])) for error in data['errors']],
+                         [(4, ['status']), (5, ['title'])])
+
+        report = Task.objects.get(title='Отчёт')
+        self.assertEqual((report.owner, report.status), (self.user, Status.DONE))
+        self.assertEqual(sorted(report.categories.values_list('name', flat=True)), ['архив', 'работа'])
+        self.assertEqual(report.subtask_set.get().status, Status.IN_PROGRESS)
+        self.assertEqual(Category.objects.get(name='работа').task_count, 1)
+        self.assertEqual(get_task_stats(self.user.id).total, 2)
+
+    def test_ndjson_progress_stream(self):
+        deadline = self.deadline.isoformat()
+        lines = [json.dumps({'title': f'task {i}', 'deadline': deadline}) for i in range(3)] + ['{broken']
+        response = self.upload('tasks.ndjson', '\n'.join(lines), '?stream=ndjson')
+        self.assertEqual(response.status_code, 200)
+        progress = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertTrue(progress[-1]['done'])
+        self.assertEqual((progress[-1]['tasks_created'], progress[-1]['error_count']), (3, 1))
+        self.assertEqual(Task.objects.filter(owner=self.user).count(), 3)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.upload('tasks.txt', 'title').status_code, 400)
+        self.assertFalse(Task.objects.exists())
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        work = Category.objects.create(name='работа')
+        self.create_task('Отчёт, "квартальный"', status=Status.DONE, categories=[work], subtasks=2)
+        self.create_task('Покупки')
+
+    def export(self, fmt):
+        response = self.client.get('/tasks/export/', {'type': fmt})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def comparable(self, body):
+        # id и время создания после повторного импорта другие
+        rows = [json.loads(line) for line in body.splitlines()]
+        for row in rows:
+            del row['id'], row['created_at'], row['updated_at']
+            for subtask in row['subtasks']:
+                del subtask['id'], subtask['created_at']
+        return sorted(rows, key=lambda row: row['title'])
+
+    def test_ndjson(self):
+        rows = self.comparable(self.export('ndjson'))
+        self.assertEqual([row['title'] for row in rows], ['Отчёт, "квартальный"', 'Покупки'])
+        self.assertEqual(rows[0]['categories'], ['работа'])
+        self.assertEqual(len(rows[0]['subtasks']), 2)
+
+    def test_csv_round_trip(self):
+        before = self.comparable(self.export('ndjson'))
+        content = self.export('csv')
+        Task.objects.all().delete()
+        upload = SimpleUploadedFile('tasks.csv', content.encode())
+        response = self.client.post('/tasks/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.json()['tasks_created'], 2, response.content)
+        self.assertEqual(self.comparable(self.export('ndjson')), before)
+
+    def test_filters_and_formats(self):
+        response = self.client.get('/tasks/export/', {'type': 'ndjson', 'status': 'done'})
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 1)
+        self.assertEqual(self.client.get('/tasks/export/', {'type': 'xml'}).status_code, 400)
+
+    def test_chunk_size_does_not_change_output(self):
+        tasks = Task.objects.filter(owner=self.user)
+        for stream in (stream_csv, stream_ndjson):
+            # Задачи — одним запросом (курсором), подзадачи и категории — по запросу на чанк
+            with self.assertNumQueries(1 + 2 * 2):
+                chunked = ''.join(stream(tasks, chunk_size=1))
+            self.assertEqual(chunked, ''.join(stream(tasks)))
+        self.assertEqual(''.join(stream_csv(Task.objects.none())).splitlines(), [','.join(
+            ['id', 'title', 'description', 'status', 'deadline', 'created_at', 'updated_at', 'categories', 'subtasks'])])
+
+    def test_requires_authentication(self):
+        self.assertIn(APIClient().get('/tasks/export/').status_code, (401, 403))
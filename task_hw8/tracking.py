@@ -0,0 +1,62 @@
+from django.db.models import DEFERRED
+
+
+class FieldTrackingMixin:
+    """Запоминает значения колонок в момент загрузки из БД.
+
+    Позволяет узнать, что изменилось с момента загрузки, без повторного SELECT.
+    Ключи — attname (owner_id, а не owner). После save() и refresh_from_db()
+    снимок обновляется; bulk_update() его не трогает.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._original_values = {
+            name: value for name, value in zip(field_names, values) if value is not DEFERRED
+        }
+        return instance
+
+    @property
+    def is_tracked(self):
+        return hasattr(self, '_original_values')
+
+    def is_field_tracked(self, attname):
+        return attname in getattr(self, '_original_values', {})
+
+    def get_original(self, attname, default=None):
+        return getattr(self, '_original_values', {}).get(attname, default)
+
+    def has_changed(self, attname):
+        if not self.is_field_tracked(attname):
+            return True
+        return self._original_values[attname] != getattr(self, attname)
+
+    def changed_fields(self):
+        """{attname: (старое, новое)} для загруженных колонок, которые поменялись."""
+        return {
+            name: (old, getattr(self, name))
+            for name, old in getattr(self, '_original_values', {}).items()
+            if old != getattr(self, name)
+        }
+
+    def snapshot_original_values(self, attnames=None):
+        loaded = self.__dict__
+        if attnames is None:
+            attnames = [field.attname for field in self._meta.concrete_fields]
+        originals = getattr(self, '_original_values', {})
+        originals.update({name: loaded[name] for name in attnames if name in loaded})
+        self._original_values = originals
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = [self._meta.get_field(name).attname for name in update_fields]
+        self.snapshot_original_values(update_fields)
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is not None:
+            fields = [self._meta.get_field(name).attname for name in fields]
+        self.snapshot_original_values(fields)
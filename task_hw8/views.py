@@ -1,24 +1,25 @@
-from datetime import timedelta
-from collections import Counter
+from datetime import datetime, time, timedelta
 import calendar
 import logging
 
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.conf import settings
 
 from rest_framework import status, viewsets, permissions
-from rest_framework.decorators import api_view, renderer_classes, action
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, action
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import MultiPartParser
 from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models.functions import ExtractWeekDay
 
 #from .models import Task, SubTask, Category
-from task_hw8.models import Task, SubTask, Category
+from task_hw8.models import Task, SubTask, Category, Status, parse_status
 
 from .serializers import (
     TaskSerializer,
@@ -28,11 +29,29 @@ from .serializers import (
     SubTaskCreateSerializer,
     CategorySerializer
 )
-from .pagination import SubTaskPagination
+from .bulk import BulkWriteAPIView
+from .cache import CATEGORIES_SCOPE, CachedResponseMixin, bump_user_versions, cache_response, counters
+from .conditional import ConditionalGetMixin
+from .export import EXPORT_FORMATS, export_response
+from .fast_serializers import ValuesListMixin, values_serializer
+from .filters import SubTaskFilter, TaskFilter
+from .importer import IMPORT_FORMATS, detect_format, import_tasks
+from .optimizers import QuerySetOptimizerMixin, optimize_queryset
+from .pagination import TaskListPagination, SubTaskListPagination
+from .search import FullTextSearchFilter
+from .notifications import enqueue_status_changes
+from .stats import (
+    category_task_counts,
+    get_task_stats,
+    recompute_task_stats,
+    refresh_category_task_counts,
+    status_counts,
+)
+from .streaming import STREAM_CONTENT_TYPES, dumps, streaming_response
 from .permissions import IsAdminOrReadOnly, IsOwnerOrReadOnly
 
 
-from rest_framework_simplejwt.tokens import RefreshToken
+from .blacklist import CachedBlacklistRefreshToken
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
@@ -45,7 +64,7 @@ class LogOutAPIView(APIView):
         response = Response(status=status.HTTP_200_OK)
         if refresh_token:
             try:
-                token = RefreshToken(refresh_token)
+                token = CachedBlacklistRefreshToken(refresh_token)
                 token.blacklist()
             except Exception:
                 pass
@@ -66,7 +85,8 @@ def test_log(request):
     return HttpResponse("Test log recorded.")
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+    cache_scope = CATEGORIES_SCOPE
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
@@ -74,18 +94,22 @@ class CategoryViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def count_tasks(self, request, pk=None):
         category = self.get_object()
-        count = Task.objects.filter(categories=category).count()
-        return Response({'task_count': count})
+        return Response({'task_count': category.task_count})
+
+    @action(detail=False, methods=['get'], url_path='task-counts')
+    def task_counts(self, request):
+        return Response(category_task_counts())
 
 
-class TaskListCreateView(ListCreateAPIView):
+class TaskListCreateView(ConditionalGetMixin, CachedResponseMixin, ValuesListMixin, QuerySetOptimizerMixin, ListCreateAPIView):
     serializer_class = TaskCreateSerializer
+    pagination_class = TaskListPagination
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['status', 'deadline']
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
+    filterset_class = TaskFilter
     search_fields = ['title', 'description']
     ordering_fields = ['created_at']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
 
 
     def get_queryset(self):
@@ -96,24 +120,75 @@ class TaskListCreateView(ListCreateAPIView):
         serializer.save(owner=self.request.user)
 
 
-class TaskRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
-    serializer_class = TaskDetailSerializer
+class TaskBulkView(BulkWriteAPIView):
+    model = Task
+    serializer_class = TaskCreateSerializer
+
+    def after_write(self, objs):
+        recompute_task_stats([self.request.user.id])
+        if self.m2m_touched.get('categories'):
+            refresh_category_task_counts(self.m2m_touched['categories'])
+        enqueue_status_changes([
+            (obj, obj.get_original('status'))
+            for obj in objs
+            if obj.is_field_tracked('status') and obj.has_changed('status')
+        ])
+
+
+class TaskImportView(APIView):
+    """Импорт задач из CSV/NDJSON (multipart, поле file); формат — по расширению или ?type=.
+
+    С ?stream=ndjson прогресс отдаётся строкой после каждого чанка, последняя строка — итог.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
 
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Загрузите файл в поле file'}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.query_params.get('type') or detect_format(upload.name)
+        if fmt not in IMPORT_FORMATS:
+            return Response({'error': f'Формат файла: {", ".join(IMPORT_FORMATS)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        progress = import_tasks(request.user, upload, fmt, workers=settings.TASK_IMPORT_WORKERS)
+        if request.query_params.get('stream') == 'ndjson':
+            return StreamingHttpResponse(self.stream_progress(progress),
+                                         content_type=STREAM_CONTENT_TYPES['ndjson'])
+
+        for result in progress:
+            pass
+        response_status = status.HTTP_201_CREATED if result.tasks_created else status.HTTP_400_BAD_REQUEST
+        return Response(result.as_dict(), status=response_status)
+
+    def stream_progress(self, progress):
+        result, last = None, None
+        for result in progress:
+            # Последнее значение генератора повторяет прогресс последнего чанка
+            if result.progress() != last:
+                last = result.progress()
+                yield dumps(last) + '\n'
+        yield dumps({'done': True, **result.as_dict()}) + '\n'
+
+
+class TaskRetrieveUpdateDestroyView(ConditionalGetMixin, CachedResponseMixin, QuerySetOptimizerMixin, RetrieveUpdateDestroyAPIView):
+    serializer_class = TaskDetailSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
 
     def get_queryset(self):
         return Task.objects.filter(owner=self.request.user)
 
 
-class SubTaskListCreateView(ListCreateAPIView):
+class SubTaskListCreateView(ConditionalGetMixin, CachedResponseMixin, ValuesListMixin, QuerySetOptimizerMixin, ListCreateAPIView):
     serializer_class = SubTaskCreateSerializer
-    pagination_class = SubTaskPagination
+    pagination_class = SubTaskListPagination
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['status', 'deadline']
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
+    filterset_class = SubTaskFilter
     search_fields = ['title', 'description']
     ordering_fields = ['created_at']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
 
     def get_queryset(self):
         return SubTask.objects.filter(owner=self.request.user)
@@ -122,7 +197,17 @@ class SubTaskListCreateView(ListCreateAPIView):
         serializer.save(owner=self.request.user)
 
 
-class SubTaskRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
+class SubTaskBulkView(BulkWriteAPIView):
+    model = SubTask
+    serializer_class = SubTaskCreateSerializer
+
+    def after_write(self, objs):
+        # Подзадачи видны в карточке задачи, а задача может принадлежать другому пользователю
+        bump_user_versions(Task.objects.filter(pk__in={obj.task_id for obj in objs})
+                           .values_list('owner_id', flat=True).distinct())
+
+
+class SubTaskRetrieveUpdateDestroyView(ConditionalGetMixin, QuerySetOptimizerMixin, RetrieveUpdateDestroyAPIView):
     serializer_class = SubTaskSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
 
@@ -130,27 +215,45 @@ class SubTaskRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
         return SubTask.objects.filter(owner=self.request.user)
 
 
-class SubTaskListView(ListAPIView):
+class SubTaskListView(ConditionalGetMixin, ValuesListMixin, QuerySetOptimizerMixin, ListAPIView):
     serializer_class = SubTaskSerializer
-    pagination_class = SubTaskPagination
+    pagination_class = SubTaskListPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        queryset = SubTask.objects.filter(owner=self.request.user).order_by('-created_at')
+        queryset = SubTask.objects.filter(owner=self.request.user).order_by('-created_at', '-id')
         task_title = self.request.query_params.get('task')
         status_param = self.request.query_params.get('status')
 
         if task_title:
             queryset = queryset.filter(task__title__icontains=task_title)
         if status_param:
-            queryset = queryset.filter(status__iexact=status_param)
+            # Метка без учёта регистра -> число: равенство по индексу вместо UPPER()/LIKE
+            status_value = parse_status(status_param)
+            if status_value is None:
+                return queryset.none()
+            queryset = queryset.filter(status=status_value)
 
         return queryset
 
 
+def parse_deadline_bound(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
 @api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
 def get_tasks_by_weekday(request):
     weekday_name = request.query_params.get('weekday', None)
+    tasks = Task.objects.filter(owner=request.user)
 
     if weekday_name:
         weekdays_map = {day.lower(): idx for idx, day in enumerate(calendar.day_name)}
@@ -158,14 +261,40 @@ def get_tasks_by_weekday(request):
         if weekday_num is None:
             return Response({'error': 'Некорректное имя дня недели'}, status=400)
 
-        drf_weekday_num = weekday_num + 1
-        tasks = Task.objects.annotate(weekday=ExtractWeekDay('deadline'))\
-                   .filter(weekday=drf_weekday_num, owner=request.user)
-    else:
-        tasks = Task.objects.filter(owner=request.user)
+        tasks = tasks.filter(deadline_weekday=weekday_num)
 
-    serializer = TaskSerializer(tasks, many=True)
-    return Response(serializer.data)
+    try:
+        deadline_from = request.query_params.get('deadline_from')
+        deadline_to = request.query_params.get('deadline_to')
+        if deadline_from:
+            tasks = tasks.filter(deadline__gte=parse_deadline_bound(deadline_from))
+        if deadline_to:
+            tasks = tasks.filter(deadline__lte=parse_deadline_bound(deadline_to))
+    except ValueError:
+        return Response({'error': 'Некорректная дата в deadline_from/deadline_to'}, status=400)
+
+    tasks = optimize_queryset(tasks.order_by('-created_at', '-id'), TaskSerializer())
+    stream = streaming_response(request, tasks, TaskSerializer)
+    if stream is not None:
+        return stream
+
+    fast = values_serializer(TaskSerializer)
+    paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+    page = paginator.paginate_queryset(fast.queryset(tasks), request)
+    return paginator.get_paginated_response(fast.to_representation(page))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_tasks(request):
+    """Все задачи пользователя одним потоком: ?type=csv|ndjson, фильтры как у /tasks/."""
+    fmt = request.query_params.get('type', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return Response({'error': f'type: {", ".join(EXPORT_FORMATS)}'}, status=400)
+    filterset = TaskFilter(request.query_params, queryset=Task.objects.filter(owner=request.user))
+    if not filterset.is_valid():
+        return Response(filterset.errors, status=400)
+    return export_response(filterset.qs, fmt)
 
 
 @api_view(['GET', 'POST'])
@@ -182,16 +311,22 @@ def create_task(request):
 
 
 @api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
 def get_all_tasks(request):
-    tasks = Task.objects.filter(owner=request.user)
-    serializer = TaskSerializer(tasks, many=True)
-    return Response(serializer.data)
+    tasks = optimize_queryset(Task.objects.filter(owner=request.user), TaskSerializer())
+    stream = streaming_response(request, tasks, TaskSerializer)
+    if stream is not None:
+        return stream
+
+    fast = values_serializer(TaskSerializer)
+    return Response(fast.to_representation(fast.queryset(tasks)))
 
 
 @api_view(['GET'])
 def get_task_by_id(request, pk):
     try:
-        task = Task.objects.get(pk=pk, owner=request.user)
+        tasks = optimize_queryset(Task.objects.all(), TaskDetailSerializer())
+        task = tasks.get(pk=pk, owner=request.user)
     except Task.DoesNotExist:
         return Response({'error': 'Задача не найдена'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -200,19 +335,29 @@ def get_task_by_id(request, pk):
 
 
 @api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@cache_response(timeout=60)  # просроченность меняется со временем и без записей
 def task_statistics(request):
-    tasks = Task.objects.filter(owner=request.user)
-    total_tasks = tasks.count()
-    status_counts = Counter(tasks.values_list('status', flat=True))
-    overdue_tasks = tasks.filter(deadline__lt=timezone.now()).exclude(status='Done').count()
+    stats = get_task_stats(request.user.id)
+    # Просроченность зависит от текущего времени, поэтому её нельзя хранить
+    # счётчиком — считаем по индексу (owner, deadline)
+    overdue_tasks = Task.objects.filter(owner=request.user, deadline__lt=timezone.now())\
+                        .exclude(status=Status.DONE).count()
 
     return Response({
-        'total_tasks': total_tasks,
-        'status_counts': status_counts,
+        'total_tasks': stats.total,
+        'status_counts': status_counts(stats),
         'overdue_tasks': overdue_tasks
     })
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def cache_statistics(request):
+    """Попадания и промахи кеша ответов в обслужившем запрос процессе."""
+    return Response(counters.snapshot())
+
+
 # class SubTaskListCreateView(APIView):
 #     def get(self, request):
 #         subtasks = SubTask.objects.all()
@@ -256,5 +401,3 @@ def task_statistics(request):
 #             return Response({'error': 'Подзадача не найдена'}, status=404)
 #         subtask.delete()
 #         return Response(status=204)
-
-